@@ -0,0 +1,131 @@
+"""
+Import-time benchmark (python -X importtime) of command building and probing paths.
+
+Fail (exit code 1) if any guarded path doesn't import, import heavy dependencies or exceed time budget.
+Reported paths are measured the same way, but their import error isn't a failure.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 150] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# path name -> statement
+GUARDED_PATHS = {
+    "package": "import ffmpegpy",
+    "process": "from ffmpegpy.util.io import Subprocess, Pipe; from ffmpegpy.log import LogReader; "
+               "from ffmpegpy.progress import ProgressReader",
+    "pool": "from ffmpegpy.pool import FramePool",
+}
+
+# paths, which don't import in every environment yet (options of codecs and streams), they are guarded
+# once they import.
+REPORTED_PATHS = {
+    "command": "from ffmpegpy._ffmpeg import FFmpeg, InputStream, OutputStream",
+    "probe": "from ffmpegpy.ffprobe import FFprobe",
+    "capture": "import ffmpegpy.capture",
+}
+
+FORBIDDEN_MODULES = ("cv2", "numpy", "util.compression", "util.media")
+
+RE_IMPORT_TIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+
+def measure(statement):
+    """
+    Run statement in fresh interpreter.
+
+    Returns:
+        (total cumulative microseconds, {module: cumulative microseconds}, error)
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    modules = {}
+    total = 0
+    errors = []
+    for line in process.stderr.decode(errors="replace").splitlines():
+        matched = RE_IMPORT_TIME.match(line)
+        if matched is None:
+            if not line.startswith("import time:"):
+                errors.append(line)
+            continue
+
+        _, cumulative, indent, module = matched.groups()
+        modules[module] = int(cumulative)
+
+        # top-level imports has 1 space indent.
+        if len(indent) == 1:
+            total += int(cumulative)
+
+    error = "\n".join(errors) if process.returncode != 0 else None
+    return total, modules, error
+
+
+def run(budget_ms, repeat):
+    results = {}
+    for name, statement in {**GUARDED_PATHS, **REPORTED_PATHS}.items():
+        timings = []
+        modules = {}
+        error = None
+        for _ in range(repeat):
+            total, modules, error = measure(statement)
+            if error:
+                break
+            timings.append(total)
+
+        result = {
+            "statement": statement,
+            "error": error,
+            "best_ms": min(timings) / 1000 if timings else None,
+            "forbidden": sorted(module for module in modules if module in FORBIDDEN_MODULES),
+            "slowest": sorted(
+                ((module, cumulative / 1000) for module, cumulative in modules.items() if module.startswith("ffmpegpy")),
+                key=lambda item: -item[1]
+            )[:5]
+        }
+
+        violations = []
+        if error and name in GUARDED_PATHS:
+            violations.append("import error")
+        if result["forbidden"]:
+            violations.append(f"import heavy modules {result['forbidden']}")
+        if result["best_ms"] is not None and result["best_ms"] > budget_ms:
+            violations.append(f"{result['best_ms']:.1f}ms > budget {budget_ms}ms")
+        result["violations"] = violations
+        results[name] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=150, help="Time budget of each path (default: 150ms)")
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N runs (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print result as JSON")
+    args = parser.parse_args()
+
+    results = run(args.budget_ms, args.repeat)
+    failed = any(result["violations"] for result in results.values())
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            best = "-" if result["best_ms"] is None else f"{result['best_ms']:.1f}ms"
+            status = "FAIL" if result["violations"] else "SKIP" if result["error"] else "OK"
+            print(f"{name:10} {best:>10}  {status}  {'; '.join(result['violations'])}")
+            if result["error"]:
+                print(f"\t{result['error']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""
+End-to-end pipeline throughput benchmark.
+
+Sources are generated by lavfi (testsrc2 / sine), so no media file is needed. Measure:
+    capture     frames/s, MB/s and read syscalls/frame of VideoCapture -> FrameReader by resolution,
+                pixel format and pipe capacity.
+    chunk       MB/s of raw pipe reads (ProcessHandler.read) by chunk size.
+    encode      encode throughput of lavfi source -> libx264 -> null muxer.
+    encode_pipe encode throughput of raw frames written to stdin (VideoGenerator-style).
+    probe       FFprobe latency.
+    build       command building cost.
+
+Results are JSON, compare with results of another commit by `--compare`.
+Exit code 1 if any metric regresses more than `--threshold`.
+
+Usage:
+    python benchmarks/pipeline.py [--quick] [--frames 300] [--repeat 3] [--output result.json]
+    python benchmarks/pipeline.py --compare baseline.json [--threshold 0.1]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ffmpegpy._ffmpeg  # noqa: E402
+import ffmpegpy.ffprobe  # noqa: E402
+from ffmpegpy._ffmpeg import FFmpeg, InputStream, OutputStream, PIPE_LINE, LogLevel  # noqa: E402
+from ffmpegpy.capture import VideoCapture, ProcessHandler  # noqa: E402
+from ffmpegpy.codecs.video.libx import LibX264, Preset  # noqa: E402
+from ffmpegpy.ffprobe import FFprobe  # noqa: E402
+from ffmpegpy.formats.demuxers.raw_video import RawVideo as RawVideoDemuxer  # noqa: E402
+from ffmpegpy.formats.format import Muxer, FormatMuxer  # noqa: E402
+from ffmpegpy.formats.lavfi import LavfiDemuxer, testsrc2, sine  # noqa: E402
+from ffmpegpy.formats.pixel_format import PixelFormat  # noqa: E402
+from ffmpegpy.progress import ProgressInfo  # noqa: E402
+from ffmpegpy.util.io import Subprocess  # noqa: E402
+
+RATE = 30
+RESOLUTIONS = ((320, 240), (1280, 720), (1920, 1080))
+QUICK_RESOLUTIONS = ((320, 240), (1280, 720))
+PIX_FMTS = (PixelFormat.BGR24, PixelFormat.RGB24)
+CHUNK_SIZES = (0x1000, 0x10000, 0x100000)
+# pipe capacity of FrameReader: None=system default, "frame"=frame size
+PIPE_SIZES = {"default": None, "frame": "frame"}
+PROC_IO_FILE = "/proc/self/io"
+BUILD_ITERATIONS = 2000
+PROBE_ITERATIONS = 10
+
+# metric -> True if higher is better
+METRICS = {
+    "fps": True,
+    "mb_s": True,
+    "latency_ms": False,
+    "build_us": False,
+    "syscalls_per_frame": False,
+}
+
+
+def _frame_bytes(size):
+    # 3 bytes/pixel: FrameReader only support rgb24 / bgr24
+    return size[0] * size[1] * 3
+
+
+def _read_syscalls():
+    """Read syscalls of this process (Linux), None if not available."""
+    try:
+        with open(PROC_IO_FILE) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key == "syscr":
+                    return int(value)
+    except OSError:
+        pass
+    return None
+
+
+def _null_output(codec=None):
+    muxer = Muxer()
+    muxer.format = FormatMuxer.NULL
+    return OutputStream("-", codec=codec, muxer=muxer)
+
+
+def _x264():
+    codec = LibX264()
+    codec.preset = Preset.ULTRA_FAST
+    return codec
+
+
+def _run_until_end(process):
+    process.wait()
+    if process.returncode != 0:
+        raise process.error(f"Process exited - code {process.returncode}")
+
+    if process.progress_reader is not None:
+        process.progress_reader.join()
+        return process.progress_reader.progress
+
+
+def bench_capture(size, pix_fmt, pipe_size, frames):
+    capture = VideoCapture(testsrc2(size, RATE, frames / RATE), pix_fmt=pix_fmt, demuxer=LavfiDemuxer())
+    capture.mpeg.loglevel = LogLevel.ERROR
+
+    count = 0
+    start = time.perf_counter()
+    syscalls = _read_syscalls()
+    if pipe_size == "frame":
+        pipe_size = _frame_bytes(size)
+    reader = capture.run(pipe_size=pipe_size)
+    while True:
+        try:
+            frame = capture.read()
+        except RuntimeError:
+            break
+
+        if frame is None:
+            break
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "frames": count,
+        "fps": count / elapsed,
+        "mb_s": count * _frame_bytes(size) / elapsed / 1e6,
+        "pipe_size": reader.pipe_size,
+    }
+    if syscalls is not None and count:
+        # include few reads of log / progress threads.
+        result["syscalls_per_frame"] = (_read_syscalls() - syscalls) / count
+    return result
+
+
+def bench_chunk(size, chunk_size, frames):
+    capture = VideoCapture(testsrc2(size, RATE, frames / RATE), demuxer=LavfiDemuxer())
+    capture.mpeg.loglevel = LogLevel.ERROR
+
+    total = 0
+    start = time.perf_counter()
+    capture.process = ProcessHandler(capture.mpeg.run(), chunk_size)
+    while True:
+        try:
+            data = capture.process.read()
+        except RuntimeError:
+            break
+
+        if not data:
+            break
+        total += len(data)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": total // _frame_bytes(size),
+        "fps": total / _frame_bytes(size) / elapsed,
+        "mb_s": total / elapsed / 1e6,
+    }
+
+
+def bench_encode(size, frames):
+    input_stream = InputStream(testsrc2(size, RATE, frames / RATE), demuxer=LavfiDemuxer())
+    mpeg = FFmpeg(input_stream, _null_output(_x264()))
+    mpeg.loglevel = LogLevel.ERROR
+
+    start = time.perf_counter()
+    progress = _run_until_end(mpeg.run(stdin=Subprocess.DEVNULL, progress=True))
+    elapsed = time.perf_counter() - start
+
+    count = progress.frame if progress is not None and progress.is_set(ProgressInfo.frame) else frames
+    return {
+        "frames": count,
+        "fps": count / elapsed,
+    }
+
+
+def bench_encode_pipe(size, frames):
+    demuxer = RawVideoDemuxer()
+    demuxer.framerate = RATE
+    demuxer.pixel_format = PixelFormat.BGR24
+    demuxer.video_size = size
+
+    mpeg = FFmpeg(InputStream(PIPE_LINE, demuxer=demuxer), _null_output(_x264()))
+    mpeg.loglevel = LogLevel.ERROR
+
+    # gradient frame, so encoder doesn't work on a flat image.
+    width, height = size
+    frame = bytes(((x + y) & 0xFF for y in range(height) for x in range(width) for _ in range(3)))
+
+    start = time.perf_counter()
+    process = mpeg.run()
+    for _ in range(frames):
+        process.write(frame)
+    process.stdin.close()
+    _run_until_end(process)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": frames,
+        "fps": frames / elapsed,
+        "mb_s": frames * len(frame) / elapsed / 1e6,
+    }
+
+
+def bench_probe(size, iterations=PROBE_ITERATIONS):
+    sources = {
+        "video": testsrc2(size, RATE, 1),
+        "audio": sine(duration=1),
+    }
+
+    result = {}
+    for name, src in sources.items():
+        probe = FFprobe(src, LavfiDemuxer())
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            probe.refresh()
+            timings.append(time.perf_counter() - start)
+        result[name] = statistics.median(timings) * 1000
+    return {"latency_ms": result["video"], "audio_latency_ms": result["audio"]}
+
+
+def bench_build(iterations=BUILD_ITERATIONS):
+    def build():
+        input_stream = InputStream(testsrc2(), demuxer=LavfiDemuxer())
+        output_stream = OutputStream("out.mp4", codec=_x264())
+        output_stream.map("v:0")
+        return FFmpeg(input_stream, output_stream).build()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    elapsed = time.perf_counter() - start
+    return {"build_us": elapsed / iterations * 1e6}
+
+
+def best_of(repeat, func, *args):
+    """Best run by first metric of METRICS in result."""
+    results = [func(*args) for _ in range(repeat)]
+    for metric, higher in METRICS.items():
+        if metric in results[0]:
+            return (max if higher else min)(results, key=lambda result: result[metric])
+    return results[0]
+
+
+def cases(quick, frames):
+    resolutions = QUICK_RESOLUTIONS if quick else RESOLUTIONS
+    for size in resolutions:
+        for pix_fmt in PIX_FMTS:
+            for pipe, pipe_size in PIPE_SIZES.items():
+                yield "capture", {"size": f"{size[0]}x{size[1]}", "pix_fmt": pix_fmt, "pipe": pipe}, \
+                    bench_capture, (size, pix_fmt, pipe_size, frames)
+
+    chunk_resolution = resolutions[-1]
+    for chunk_size in CHUNK_SIZES + (_frame_bytes(chunk_resolution),):
+        yield "chunk", {"size": f"{chunk_resolution[0]}x{chunk_resolution[1]}", "chunk_size": chunk_size}, \
+            bench_chunk, (chunk_resolution, chunk_size, frames)
+
+    for size in resolutions:
+        yield "encode", {"size": f"{size[0]}x{size[1]}"}, bench_encode, (size, frames)
+        yield "encode_pipe", {"size": f"{size[0]}x{size[1]}"}, bench_encode_pipe, (size, frames)
+
+    yield "probe", {"size": "1280x720"}, bench_probe, ((1280, 720),)
+    yield "build", {}, bench_build, ()
+
+
+def case_key(name, params):
+    return name + "".join(f" {key}={value}" for key, value in sorted(params.items()))
+
+
+def environment(ffmpeg):
+    def output(cmd):
+        try:
+            return subprocess.run(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) \
+                .stdout.decode(errors="replace").strip()
+        except OSError:
+            return None
+
+    version = output([ffmpeg, "-version"])
+    return {
+        "commit": output(["git", "rev-parse", "--short", "HEAD"]),
+        "dirty": bool(output(["git", "status", "--porcelain", "--untracked-files=no"])),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": version.splitlines()[0] if version else None,
+    }
+
+
+def run(quick, frames, repeat):
+    results = {}
+    for name, params, func, args in cases(quick, frames):
+        key = case_key(name, params)
+        try:
+            metrics = best_of(repeat, func, *args)
+            error = None
+        except Exception as e:
+            metrics = {}
+            error = f"{type(e).__name__}: {e}"
+
+        results[key] = {"name": name, "params": params, "metrics": metrics, "error": error}
+        print(f"{key:50} {_format_metrics(metrics) if error is None else error}", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare metrics with baseline.
+
+    Returns:
+        list of (case, metric, baseline value, value, relative change, is regression)
+    """
+    rows = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+
+        for metric, higher in METRICS.items():
+            if metric not in result["metrics"] or metric not in base["metrics"]:
+                continue
+
+            old, new = base["metrics"][metric], result["metrics"][metric]
+            change = (new - old) / old if old else 0.
+            regression = -change > threshold if higher else change > threshold
+            rows.append((key, metric, old, new, change, regression))
+    return rows
+
+
+def _format_metrics(metrics):
+    return "  ".join(f"{metric}={value:.2f}" if isinstance(value, float) else f"{metric}={value}"
+                     for metric, value in metrics.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Fewer resolutions")
+    parser.add_argument("--frames", type=int, default=300, help="Frames of each run (default: 300)")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs (default: 3)")
+    parser.add_argument("--output", help="Write JSON result to file (default: stdout)")
+    parser.add_argument("--compare", help="JSON result of baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change counted as regression (default: 0.1)")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="FFmpeg binary (default: ffmpeg)")
+    parser.add_argument("--ffprobe", default="ffprobe", help="FFprobe binary (default: ffprobe)")
+    args = parser.parse_args()
+
+    ffmpegpy._ffmpeg.FFMPEG_CMD = args.ffmpeg
+    ffmpegpy.ffprobe.FFPROBE_CMD = args.ffprobe
+
+    report = {
+        "environment": environment(args.ffmpeg),
+        "config": {"quick": args.quick, "frames": args.frames, "repeat": args.repeat, "rate": RATE},
+        "results": run(args.quick, args.frames, args.repeat),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    failed = any(result["error"] for result in report["results"].values())
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        print(f"\nBaseline: {baseline['environment'].get('commit')} -> {report['environment']['commit']}",
+              file=sys.stderr)
+        for key, metric, old, new, change, regression in compare(report["results"], baseline["results"],
+                                                                 args.threshold):
+            status = "REGRESSION" if regression else ""
+            print(f"{key:50} {metric:12} {old:12.2f} -> {new:12.2f} {change:+8.1%}  {status}", file=sys.stderr)
+            failed |= regression
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
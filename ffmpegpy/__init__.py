@@ -1,16 +1,61 @@
+"""
+Public API is loaded lazily (PEP 562): `import ffmpegpy` doesn't import any submodule,
+and command building or probing never import cv2 / numpy.
+"""
+import importlib
 
-# common
-# from ._ffmpeg import *
-# from .capture import *
-#
-# # codecs
-# from .codecs.copy import CopyCoding
-# from .codecs.coding import MotionEstimation, ErrDetectFlags, GenericFlags, GenericFlags2, Strict
-#
-# from .codecs.video import libx, nvenc, cuvid
-# from .codecs.video.libx import LibX264, LibX265
-# from .codecs.video.nvenc import NvencH265, NvencH264
-#
-# from ffmpegpy.formats.format import *
-# from .hwaccel import *
-# from .ffprobe import *
+_LAZY_ATTRS = {
+    # common
+    "FFmpeg": "._ffmpeg",
+    "InputStream": "._ffmpeg",
+    "OutputStream": "._ffmpeg",
+    "LogLevel": "._ffmpeg",
+    "VSync": "._ffmpeg",
+    "VideoCapture": ".capture",
+    "VideoWriter": ".capture",
+    "Capture": ".capture",
+    "Frame": ".capture",
+    "FrameReader": ".capture",
+    "ProcessHandler": ".capture",
+    "PassthroughHandler": ".capture",
+    "Interpolation": ".capture",
+    "LiveCapture": ".capture",
+    "LatestFrameReader": ".capture",
+    "dedupe": ".capture",
+    "FFprobe": ".ffprobe",
+    "ProbeInfo": ".ffprobe",
+    "HWAccel": ".hwaccel",
+    "HWAccelType": ".hwaccel",
+    "capabilities": ".tool",
+    "ThumbnailExtractor": ".thumbnail",
+    "CaptureGroup": ".group",
+    "CaptureSupervisor": ".supervisor",
+    "FramePool": ".pool",
+    "AudioCapture": ".audio",
+    "AudioReader": ".audio",
+    "SegmentWriter": ".segmenter",
+    "Pipe": ".util.io",
+    "NamedPipe": ".util.io",
+
+    # codecs
+    "CopyCoding": ".codecs.copy",
+    "LibX264": ".codecs.video.libx",
+    "LibX265": ".codecs.video.libx",
+    "NvencH264": ".codecs.video.nvenc",
+    "NvencH265": ".codecs.video.nvenc",
+}
+
+__all__ = sorted(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()).union(_LAZY_ATTRS))
@@ -1,8 +1,15 @@
+import codecs
+import os
+import re
+import selectors
+
 from ffmpegpy.util import check_type, convert_kwargs_to_cmd_line_args
-from ffmpegpy.util.io import Subprocess
+from ffmpegpy.util.io import Subprocess, StdinWriter, ProcessError, Pipe, iter_chunks
 from ffmpegpy.util.pyopt import Options, option, in_list_filter, is_not_params_filter
 
 from .io import InputStream, OutputStream, LogLevel, RTSPTransport, VSync
+from .progress import ProgressReader
+from .log import LogReader, LOG_LINES_DEFAULT
 
 __all__ = [
     "FFmpeg", "InputStream", "OutputStream",
@@ -13,6 +20,8 @@ LINUX_DEVICE = "/dev/video"
 PIPE_LINE = 'pipe:'
 FFMPEG_CMD = "ffmpegpy"
 FPS_DEFAULT = 15
+TRANSCODE_CHUNK = 0x10000
+RE_LOG_LINE_END = re.compile(r"[\r\n]")
 
 
 class FFmpeg(Options):
@@ -27,7 +36,10 @@ class FFmpeg(Options):
     Attributes
     ----------
     input_stream: InputStream
-        Input stream setup
+        Input stream setup (first input)
+
+    input_streams: list of InputStream
+        Input streams setup. Input index is position in list.
 
     output_streams: list of OutputStream
         Output stream setup
@@ -38,7 +50,7 @@ class FFmpeg(Options):
         if not isinstance(input_stream, InputStream):
             raise TypeError(f"Required input_stream's type is `InputStream`.")
 
-        self.input_stream = input_stream
+        self.input_streams = [input_stream]
         self.output_streams = []
 
         if output_streams:
@@ -50,11 +62,20 @@ class FFmpeg(Options):
 
     def __repr__(self):
         _str = f"{self.__class__.__name__}"
-        _str += f"\n{self.input_stream!r}"
+        for input_stream in self.input_streams:
+            _str += f"\n{input_stream!r}"
         for output_stream in self.output_streams:
             _str += f"\n{output_stream!r}"
         return _str
 
+    @property
+    def input_stream(self) -> InputStream:
+        return self.input_streams[0]
+
+    @input_stream.setter
+    def input_stream(self, input_stream):
+        self.input_streams[0] = check_type(input_stream, InputStream)
+
     @property
     def output_stream(self) -> OutputStream:
         if self.output_streams.__len__() < 1:
@@ -72,13 +93,19 @@ class FFmpeg(Options):
     def build(self):
         cmd = [FFMPEG_CMD]
         cmd += convert_kwargs_to_cmd_line_args(self.dict())
-        cmd += self.input_stream.build()
+        for input_stream in self.input_streams:
+            cmd += input_stream.build()
         for output_stream in self.output_streams:
             if hasattr(output_stream.codec, 'add_params'):
                 output_stream.codec.add_params("log-level", self.loglevel)
             cmd += output_stream.build()
         return cmd
 
+    def add_input(self, input_stream):
+        """Add input stream. Return its input index, which is used by `OutputStream.map`."""
+        self.input_streams.append(check_type(input_stream, InputStream))
+        return len(self.input_streams) - 1
+
     def add_output(self, output_stream):
         check_type(output_stream, OutputStream)
 
@@ -88,22 +115,244 @@ class FFmpeg(Options):
 
         self.output_streams.append(output_stream)
 
-    def run(self, stdin=None, stdout=None):
+    def select(self, probe_info, *indices):
+        """
+        Select input streams by absolute index of `ProbeInfo.streams`.
+        Selected streams are mapped to all outputs, other streams are discarded at demuxer,
+        so they are never decoded.
+        """
+        if not indices:
+            raise ValueError("Require at least one stream index.")
+
+        streams = {stream['index']: stream for stream in probe_info.streams}
+        for index in indices:
+            if index not in streams:
+                raise ValueError(f"Stream #{index} not found. Got streams: {sorted(streams)}")
+
+        for output_stream in self.output_streams:
+            output_stream.map(*indices)
+
+        self.input_stream.discard(*(index for index in streams if index not in indices))
+
+    def run(self, stdin=None, stdout=None, progress=None, log_lines=LOG_LINES_DEFAULT, log_listeners=(),
+            pass_fds=(), log_thread=True, args=None):
         """
         Create ffmpegpy subprocess with current settings
         call .build() to show current settings.
+
+        Parameters
+        ----------
+        progress: bool | callable | None
+            Report progress via `-progress pipe:N`. Callable is called with every ProgressInfo snapshot.
+            Latest snapshot: `process.progress_reader.progress`
+
+        log_lines: int | None
+            Drain stderr in background and keep last `log_lines` lines, classified by level.
+            See `process.log_reader`. None=stderr isn't captured.
+
+        log_listeners: list of callable
+            Listen every log line from start of process. See `LogReader.add_listener`
+
+        pass_fds: tuple of int
+            Extra file descriptors, which are inherited by process. Ex: write end of pipe of `pipe:N` output.
+            Caller owns them, close them after start so reader gets EOF when process exits.
+            Pipes of inputs and outputs (See `Pipe`) are passed and closed in Python automatically.
+
+        log_thread: bool
+            Drain stderr in LogReader thread. False=thread isn't started, caller reads `process.log_reader.stream`
+            and calls `feed` for every line. Ex: one selector for stderr of many processes.
+
+        args: list of str | None
+            Command line of `build()` to reuse, Ex: `process.command` of previous run to restart it.
+            None=command is built.
         """
         if self.output_streams.__len__() <= 0:
             raise RuntimeError("Not found any output stream.")
 
-        args = self.build()
+        args = self.build() if args is None else list(args)
+        command = tuple(args)
 
         for output_stream in self.output_streams:
             if output_stream.path == PIPE_LINE:
                 stdout = Subprocess.PIPE if stdout is None else stdout
 
+        feeds = [input_stream.data for input_stream in self.input_streams if input_stream.data is not None]
+        if len(feeds) > 1:
+            raise ValueError("Only one in-memory input, it's fed to stdin.")
+        if feeds and stdin is not None:
+            raise ValueError("stdin is used by in-memory input.")
+
         stdin = Subprocess.PIPE if stdin is None else stdin
-        return Subprocess(args, stdout=stdout, stdin=stdin)
+
+        stderr = None
+        if log_lines:
+            stderr = Subprocess.PIPE
+            self.__prefix_log_level(args)
+
+        pipes = [stream.pipe for stream in self.input_streams + self.output_streams if stream.pipe is not None]
+        progress_pipe = None
+        if progress:
+            progress_pipe = Pipe("r")
+            pipes.append(progress_pipe)
+            args[1:1] = ["-progress", progress_pipe.path]
+
+        pass_fds = tuple(pass_fds) + tuple(pipe.child_fd for pipe in pipes if pipe.child_fd is not None)
+        try:
+            process = Subprocess(args, stdout=stdout, stdin=stdin, stderr=stderr, pass_fds=pass_fds)
+        except BaseException:
+            # no process: ends of Python are closed too, so the other side of pipes sees EOF.
+            for pipe in pipes:
+                pipe.close()
+            raise
+        finally:
+            for pipe in pipes:
+                pipe.close_child()
+
+        process.command = command
+        if log_lines:
+            process.log_reader = LogReader(process.detach_stderr(), log_lines, log_listeners)
+            if log_thread:
+                process.log_reader.start()
+
+        if feeds:
+            process.stdin_writer = StdinWriter(process.detach_stdin(), feeds[0])
+            process.stdin_writer.start()
+
+        if progress:
+            process.progress_reader = ProgressReader(progress_pipe.detach(), [progress] if callable(progress) else [])
+            process.progress_reader.start()
+        return process
+
+    def transcode(self, data=None, chunk_size=TRANSCODE_CHUNK, log_lines=LOG_LINES_DEFAULT):
+        """
+        Transcode in-memory input, iterate output chunks (bytes) of PIPE_LINE output.
+
+        stdin, stdout and stderr are multiplexed by `selectors` in calling thread: input is written only while
+        stdin is writable and output is read as soon as it's ready, so neither side blocks on a full pipe.
+        Memory is bounded: one input chunk, one output chunk and last `log_lines` log lines.
+        Process is killed if iteration stops early.
+
+        Parameters
+        ----------
+        data: bytes | memoryview | file-like | iterable of bytes | None
+            Input, replaces source of first input. None=in-memory input of inputs (See `InputStream`).
+
+        Raises
+        ------
+        ProcessError:
+            Process exited with error, error logs are attached.
+
+        Examples:
+            mpeg = FFmpeg(InputStream(payload), OutputStream(PIPE_LINE, muxer=RawVideo()))
+            for chunk in mpeg.transcode():
+                response.write(chunk)
+        """
+        if data is not None:
+            self.input_stream.path = data
+
+        feeds = [input_stream.data for input_stream in self.input_streams if input_stream.data is not None]
+        if len(feeds) != 1:
+            raise ValueError("Require one in-memory input.")
+
+        if not any(output_stream.path == PIPE_LINE for output_stream in self.output_streams):
+            raise RuntimeError("Require PIPE_LINE output.")
+
+        args = self.build()
+        self.__prefix_log_level(args)
+        log_reader = LogReader(None, log_lines or LOG_LINES_DEFAULT)
+
+        pipes = [stream.pipe for stream in self.input_streams + self.output_streams if stream.pipe is not None]
+        try:
+            process = Subprocess(args, stdin=Subprocess.PIPE, stdout=Subprocess.PIPE, stderr=Subprocess.PIPE,
+                                 pass_fds=tuple(pipe.child_fd for pipe in pipes if pipe.child_fd is not None))
+        except BaseException:
+            for pipe in pipes:
+                pipe.close()
+            raise
+        finally:
+            for pipe in pipes:
+                pipe.close_child()
+
+        streams = (process.stdin, process.stdout, process.stderr)
+        selector = selectors.DefaultSelector()
+        for stream, event in zip(streams, (selectors.EVENT_WRITE, selectors.EVENT_READ, selectors.EVENT_READ)):
+            os.set_blocking(stream.fileno(), False)
+            selector.register(stream.fileno(), event)
+
+        stdin_fd, stdout_fd, stderr_fd = (stream.fileno() for stream in streams)
+        chunks = iter_chunks(feeds[0], chunk_size)
+        pending = None
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        partial = ""
+        completed = False
+
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    if key.fd == stdin_fd:
+                        if pending is None:
+                            chunk = next(chunks, None)
+                            if chunk is None:
+                                # EOF of input
+                                selector.unregister(stdin_fd)
+                                process.stdin.close()
+                                continue
+                            pending = memoryview(chunk).cast("B")
+
+                        try:
+                            size = os.write(stdin_fd, pending)
+                        except BlockingIOError:
+                            continue
+                        except BrokenPipeError:
+                            # process stops reading (Ex: -t), rest of input isn't needed.
+                            selector.unregister(stdin_fd)
+                            process.stdin.close()
+                            pending = None
+                            continue
+                        pending = pending[size:] or None
+                        continue
+
+                    try:
+                        output = os.read(key.fd, chunk_size)
+                    except BlockingIOError:
+                        continue
+
+                    if not output:
+                        selector.unregister(key.fd)
+                        continue
+
+                    if key.fd == stdout_fd:
+                        yield output
+                        continue
+
+                    *lines, partial = RE_LOG_LINE_END.split(partial + decoder.decode(output))
+                    for line in lines:
+                        log_reader.feed(line)
+            log_reader.feed(partial + decoder.decode(b"", final=True))
+            completed = True
+        finally:
+            selector.close()
+            if not completed:
+                process.kill()
+            for stream in streams:
+                stream.close()
+            process.wait()
+
+        if process.returncode != 0:
+            raise ProcessError(f"Transcode error - code {process.returncode}", process.returncode,
+                               log_reader.errors() or log_reader.tail())
+
+    @staticmethod
+    def __prefix_log_level(args):
+        # prefix every log line with its level, so LogReader can classify lines.
+        if "-loglevel" not in args:
+            args[1:1] = ["-loglevel", f"level+{LogLevel.INFO}"]
+            return
+
+        idx = args.index("-loglevel") + 1
+        if "level" not in args[idx]:
+            args[idx] = f"level+{args[idx]}"
 
     hide_banner = option("hide_banner", is_not_params_filter)
+    nostdin = option("nostdin", is_not_params_filter, doc="Disable interaction on standard input.")
     loglevel = option("loglevel", in_list_filter(get_attr_values(LogLevel)))
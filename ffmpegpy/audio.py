@@ -0,0 +1,162 @@
+from .util.lazy import lazy_import
+from ._ffmpeg import PIPE_LINE, LogLevel
+from .capture import Capture, ProcessHandler
+from .formats.pcm import PCM, SampleFormat, SAMPLE_DTYPES
+
+__all__ = ["AudioCapture", "AudioReader"]
+
+numpy = lazy_import("numpy")
+
+SAMPLE_RATE_DEFAULT = 16000
+CHUNK_FRAMES_DEFAULT = 1024
+RING_CHUNKS_DEFAULT = 4
+
+
+class AudioReader(ProcessHandler):
+    """
+    Read fixed-length chunks of raw PCM from stdout of process.
+
+    Chunks are read straight into slots of a preallocated ring buffer, nothing is allocated per chunk.
+    A chunk is a view of its slot: it's overwritten `ring` chunks later, copy it to keep it longer.
+
+    Parameters
+    ----------
+    process: Subprocess
+
+    channels: int
+
+    dtype: str
+        numpy dtype of samples. See `SAMPLE_DTYPES`
+
+    chunk_frames: int
+        Frames (samples per channel) of chunk.
+
+    ring: int
+        Number of chunks of ring buffer.
+
+    pipe_size: int | None
+        Capacity of stdout pipe. None=system default.
+
+    Attributes
+    ----------
+    frames: int
+        Frames read. Position (seconds) of next chunk: frames / sample rate.
+    """
+
+    def __init__(self, process, channels, dtype, chunk_frames=CHUNK_FRAMES_DEFAULT, ring=RING_CHUNKS_DEFAULT,
+                 pipe_size=None):
+        if chunk_frames < 1 or ring < 1:
+            raise ValueError("chunk_frames and ring must be >= 1.")
+
+        self.ring = numpy.empty((ring, chunk_frames, channels), dtype=dtype)
+        super().__init__(process, self.ring[0].nbytes)
+        self.channels = channels
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self.__slot = 0
+
+        if pipe_size:
+            process.set_pipe_size(pipe_size)
+
+    def get_chunk(self):
+        """
+        Returns
+        -------
+            numpy.ndarray (frames, channels). Last chunk may be shorter. None at end of stream.
+        """
+        chunk = self.ring[self.__slot]
+        frames = self._process.readinto(chunk) // (chunk.itemsize * self.channels)
+        if not frames:
+            return None
+
+        self.__slot = (self.__slot + 1) % len(self.ring)
+        self.frames += frames
+        return chunk[:frames]
+
+    def read(self, chunk_size=-1):
+        return self.get_chunk()
+
+    def write(self, data):
+        raise AttributeError
+
+
+class AudioCapture(Capture):
+    """
+    Capture raw PCM samples of audio stream. Audio is decoded, resampled and mixed by ffmpeg,
+    chunks are read into numpy without copy (See `AudioReader`).
+
+    Parameters
+    ----------
+    sample_rate: int
+        Output sample rate (Hz).
+
+    channels: int
+        Output number of channels, samples are interleaved.
+
+    sample_fmt: str
+        SampleFormat of samples. S16LE=int16, F32LE=float32 in [-1, 1].
+
+    stream: str | int | dict
+        Audio stream: stream specifier, absolute stream index or stream info of `ProbeInfo.streams`.
+
+    chunk_frames: int, ring: int
+        Frames of chunk, chunks of ring buffer. See `AudioReader`
+
+    Examples:
+        capture = AudioCapture("meeting.mp4", sample_rate=16000, channels=1, chunk_frames=16000)
+        for chunk in capture:
+            transcribe(chunk)
+    """
+
+    def __init__(self, src, sample_rate=SAMPLE_RATE_DEFAULT, channels=1, sample_fmt=SampleFormat.S16LE,
+                 stream="a:0", demuxer=None, chunk_frames=CHUNK_FRAMES_DEFAULT, ring=RING_CHUNKS_DEFAULT):
+        super().__init__(src, PIPE_LINE, demuxer)
+        if sample_fmt not in SampleFormat:
+            raise ValueError(f"sample_fmt must be in {list(SampleFormat)}.")
+
+        if not self.read_probe().find_streams("audio"):
+            raise RuntimeError("No audio stream from source!")
+
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_fmt = sample_fmt
+        self.chunk_frames = chunk_frames
+        self.ring = ring
+
+        output_stream = self.mpeg.output_stream
+        output_stream.muxer = PCM()
+        output_stream.muxer.format = sample_fmt
+        output_stream.map(stream)
+        output_stream.vn = None
+        output_stream.sn = None
+        output_stream.dn = None
+        output_stream.audio_sample_rate = sample_rate
+        output_stream.audio_channels = channels
+        self.mpeg.loglevel = LogLevel.ERROR
+
+    @property
+    def dtype(self):
+        """numpy dtype of samples."""
+        return numpy.dtype(SAMPLE_DTYPES[self.sample_fmt])
+
+    def run(self, progress=None, pipe_size=None):
+        """
+        Start capturing.
+
+        Parameters
+        ----------
+        pipe_size: int | None
+            Capacity of stdout pipe. None=system default.
+        """
+        if self.process is not None:
+            raise AttributeError("Process's already existed.")
+
+        process = self.mpeg.run(progress=progress)
+        self.process = AudioReader(process, self.channels, self.dtype, self.chunk_frames, self.ring, pipe_size)
+        return self.process
+
+    def start(self, progress=None):
+        return self.run(progress)
+
+    def read(self, **kwargs):
+        return self.process.get_chunk()
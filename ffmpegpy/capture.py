@@ -1,25 +1,97 @@
+import hashlib
 import os
+import queue
+import re
+import threading
 import time
 
-import cv2
-import numpy
-
+from collections import OrderedDict
 from datetime import datetime
 
-from util.compression import compress_ndarray, decompress_ndarray, compress, decompress
-from util.media import ENCODE_JPEG, DEFAULT_QUALITY
-from util.media.image import imencode, imdecode, imwrite
-
-from ._ffmpeg import FFmpeg, InputStream, OutputStream, PIPE_LINE, FPS_DEFAULT, LogLevel
+from .util.lazy import lazy_import
+from .util.constant import ConstantClass
+from ._ffmpeg import FFmpeg, InputStream, OutputStream, PIPE_LINE, FPS_DEFAULT, LogLevel, VSync
 from .codecs import PixelFormat, EncodeVideo, EncodeVideoLIB
-from .ffprobe import FFprobe
-from library.ffmpeg.formats.format import RawVideo, FormatDemux
+from .codecs.coding import Discard, GenericFlags
+from .formats.fflags import FFlagsDemuxer
+from .formats.tee import Tee, TeeSlave, TeeOnFail
+from .ffprobe import FFprobe, ProbeInfo
+from .formats.format import FormatDemuxer
+from .formats.muxers.rawvideo import RawVideo
+
+__all__ = [
+    "VideoCapture", "VideoWriter", "Capture", "Frame", "FrameReader", "TimestampedFrameReader",
+    "ProcessHandler", "PassthroughHandler", "Interpolation", "LatestFrameReader", "LiveCapture",
+    "dedupe"
+]
+
+from .util.io import Subprocess, passthrough, PASSTHROUGH_CHUNK
+
+# heavy dependencies are imported at first use of Frame or VideoCapture.preview
+cv2 = lazy_import("cv2")
+numpy = lazy_import("numpy")
+compression = lazy_import("util.compression")
+media = lazy_import("util.media")
+image = lazy_import("util.media.image")
 
-__all__ = ["VideoCapture", "VideoWriter", "Capture", "Frame", "FrameReader", "ProcessHandler"]
+CHUNK_DEFAULT = 0x1000
 
-from util.io import Subprocess
+# seconds to wait timestamp of frame, which is read.
+TIMESTAMP_TIMEOUT = 5
+SHOWINFO = "showinfo"
+# only pts of frames are used: checksums of every plane are skipped (ffmpeg >= 5.0).
+SHOWINFO_FILTER = f"{SHOWINFO}=checksum=0"
+# log levels, which hide info lines of showinfo.
+LOG_LEVELS_BELOW_INFO = (LogLevel.WARNING, LogLevel.ERROR, LogLevel.FATAL, LogLevel.PANIC, LogLevel.QUIET)
+# options of output stream, which are changed by timestamped run and restored after start.
+TIMESTAMP_STREAM_OPTIONS = ("video_filter", "frame_rate", "video_sync")
 
-CHUNK_DEFAULT = 0x1000
+# low-latency demuxer settings of live source: bytes / microseconds read to detect streams.
+LIVE_PROBESIZE = 32768
+LIVE_ANALYZEDURATION = 100000
+RE_SHOWINFO = re.compile(r"\[Parsed_showinfo_\d+ @ [^\]]+\] n:\s*(\d+)\s+pts:\s*\S+\s+pts_time:(\S+)")
+# every line of showinfo: frame line, plane mean/stdev, side data, ...
+RE_SHOWINFO_LINE = re.compile(r"\[Parsed_showinfo_\d+ @ [^\]]+\]")
+
+DIGEST_SIZE = 16
+# luma digest samples every `DIGEST_STEP` pixel of rows and columns.
+DIGEST_STEP = 4
+
+
+def _snapshot(options, attrs):
+    """{attr: value} of options, which are set."""
+    return {attr: getattr(options, attr) for attr in attrs if options.is_set(getattr(type(options), attr))}
+
+
+def _restore(options, attrs, snapshot):
+    """Restore options from `_snapshot`, options which weren't set are unset."""
+    for attr in attrs:
+        if attr in snapshot:
+            setattr(options, attr, snapshot[attr])
+        elif options.is_set(getattr(type(options), attr)):
+            delattr(options, attr)
+
+
+def _image_encode_params(compress_type, quality):
+    if compress_type is None:
+        compress_type = media.ENCODE_JPEG
+    if quality is None:
+        quality = media.DEFAULT_QUALITY
+    return compress_type, quality
+
+
+class Interpolation(ConstantClass):
+    """
+    Scaling algorithm of `scale` filter. See: https://ffmpeg.org/ffmpeg-scaler.html#sws_005fflags
+    """
+    FAST_BILINEAR = "fast_bilinear"
+    BILINEAR = "bilinear"
+    BICUBIC = "bicubic"
+    NEAREST = "neighbor"
+    AREA = "area"
+    GAUSS = "gauss"
+    LANCZOS = "lanczos"
+    SPLINE = "spline"
 
 
 class Frame(object):
@@ -30,12 +102,22 @@ class Frame(object):
 
     Support multi-type frame: buffer, numpy.ndarray
     Auto compress and decompress with binary data. Encode, decode image if data is image's bytearray.
+
+    Frame of ndarray and frame_size is a view of the array. If the array is borrowed from `pool`,
+    `release()` returns it (See `FramePool`).
+
+    Equality and hash use cached content digest (See `digest`). Digest is cleared when `data_frame` is
+    assigned, not when the array is modified in place: call `invalidate()` after in-place modification.
     """
 
-    def __init__(self, frame, frame_size=None, dtype=None):
+    def __init__(self, frame, frame_size=None, dtype=None, pool=None):
         if not isinstance(frame, (numpy.ndarray, bytes)):
             raise TypeError("Only support frame's type are `bytes` or `numpy.ndarray`")
 
+        self.__buffer = None
+        self.__pool = None
+        self.__digests = {}
+
         if frame_size:
             if not isinstance(frame_size, (tuple, list)):
                 raise TypeError("Require frame_size is tuple or list")
@@ -48,7 +130,11 @@ class Frame(object):
                     raise ValueError("Require dtype.")
                 frame = numpy.frombuffer(frame, dtype=dtype)
 
-            frame = frame.reshape((*frame_size, -1))
+            if pool is not None:
+                self.__buffer, self.__pool = frame, pool
+
+            width, height = frame_size
+            frame = frame.reshape((height, width, -1))
             if frame.shape[2] not in [3, 4]:
                 raise ValueError(f"Number channels of frame must be 3 (RGB, BGR) or 4 (ARGB, ABGR). "
                                  f"Got {frame.shape[2]}")
@@ -66,12 +152,88 @@ class Frame(object):
         if not isinstance(other, types := (type(self), numpy.ndarray)):
             raise TypeError(f"Require: {types}")
         if isinstance(other, numpy.ndarray):
-            return numpy.all(self.data_frame == other)
-        return numpy.all(self.data_frame == other.data_frame)
+            return isinstance(self.data_frame, numpy.ndarray) and numpy.array_equal(self.data_frame, other)
+
+        if self is other:
+            return True
+        if type(self.data_frame) is not type(other.data_frame) or self.size != other.size:
+            return False
+        if isinstance(self.data_frame, numpy.ndarray) and self.data_frame.dtype != other.data_frame.dtype:
+            return False
+        return self.digest() == other.digest()
+
+    def __hash__(self):
+        return hash(self.digest())
+
+    @property
+    def data_frame(self):
+        return self.__data_frame
+
+    @data_frame.setter
+    def data_frame(self, value):
+        self.__data_frame = value
+        self.__digests = {}
+
+    def digest(self, luma=False, step=DIGEST_STEP):
+        """
+        blake2b digest of content, cached. Frames with different shape or dtype have different digests.
+
+        Parameters
+        ----------
+        luma: bool
+            Hash mean of color channels, sampled every `step` pixel of rows and columns, instead of whole buffer.
+            Much less data is hashed, changes between sampled pixels are missed.
+
+        step: int
+            Sampling step of luma digest.
+        """
+        key = (True, step) if luma else False
+        digest = self.__digests.get(key)
+        if digest is not None:
+            return digest
+
+        data = self.data_frame
+        if data is None:
+            raise ValueError("Frame is released.")
+
+        hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        if isinstance(data, numpy.ndarray):
+            if luma:
+                if data.ndim != 3:
+                    raise TypeError("Luma digest require frame of (height, width, channels).")
+                plane = data[::step, ::step, :3]
+                data = (plane.sum(axis=2, dtype=numpy.uint32) // plane.shape[2]).astype(data.dtype)
+            hasher.update(f"{data.shape}{data.dtype.str}".encode())
+            data = numpy.ascontiguousarray(data)
+        elif luma:
+            raise TypeError("Luma digest require frame of numpy.ndarray.")
+
+        hasher.update(data)
+        digest = self.__digests[key] = hasher.digest()
+        return digest
+
+    def invalidate(self):
+        """Clear cached digests. Call after in-place modification of `data_frame`."""
+        self.__digests = {}
 
     def __bytes__(self):
         return self.tobytes()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def release(self):
+        """Return buffer to pool. Frame mustn't be used after release."""
+        if self.__pool is None:
+            return
+
+        self.__pool.release(self.__buffer)
+        self.__buffer = self.__pool = None
+        self.data_frame = None
+
     @property
     def size(self):
         if isinstance(self.data_frame, numpy.ndarray):
@@ -81,17 +243,17 @@ class Frame(object):
     @classmethod
     def from_buffer(cls, data):
         try:
-            return cls(imdecode(data))
+            return cls(image.imdecode(data))
         except ValueError:
             pass
 
         try:
-            return cls(decompress_ndarray(data))
+            return cls(compression.decompress_ndarray(data))
         except ValueError:
             pass
 
         try:
-            return cls(decompress(data))
+            return cls(compression.decompress(data))
         except ValueError:
             pass
 
@@ -100,18 +262,20 @@ class Frame(object):
     def tobytes(self):
         if isinstance(self.data_frame, numpy.ndarray):
             if self.data_frame.dtype == numpy.uint8:
-                return imencode(self.data_frame)
-            return compress_ndarray(self.data_frame)
-        return compress(self.data_frame)
+                return image.imencode(self.data_frame)
+            return compression.compress_ndarray(self.data_frame)
+        return compression.compress(self.data_frame)
 
-    def encode(self, compress_type=ENCODE_JPEG, quality=DEFAULT_QUALITY):
+    def encode(self, compress_type=None, quality=None):
         """
         Like `tobytes` function but require frame's data is image bytearray.
+        Default: compress_type=ENCODE_JPEG, quality=DEFAULT_QUALITY
         :return:
         """
         if not isinstance(self.data_frame, numpy.ndarray) or self.data_frame.dtype != numpy.uint8:
             raise TypeError("Only support image bytearray")
-        return imencode(self.data_frame, compress_type, quality)
+        compress_type, quality = _image_encode_params(compress_type, quality)
+        return image.imencode(self.data_frame, compress_type, quality)
 
     @classmethod
     def decode(cls, data):
@@ -120,12 +284,13 @@ class Frame(object):
         :param data:
         :return:
         """
-        return imdecode(data)
+        return image.imdecode(data)
 
-    def save(self, file_path, compress_type=ENCODE_JPEG, quality=DEFAULT_QUALITY, over_write=False):
+    def save(self, file_path, compress_type=None, quality=None, over_write=False):
         if isinstance(self.data_frame, numpy.ndarray) and self.data_frame.dtype == numpy.uint8:
-            return imwrite(self.data_frame, file_path,
-                           encode_type=compress_type, quality=quality, over_write=over_write)
+            compress_type, quality = _image_encode_params(compress_type, quality)
+            return image.imwrite(self.data_frame, file_path,
+                                 encode_type=compress_type, quality=quality, over_write=over_write)
 
         with open(file_path, "wb") as f:
             f.write(self.tobytes())
@@ -140,6 +305,48 @@ class Frame(object):
         return frame
 
 
+def dedupe(frames, window=1, luma=False, step=DIGEST_STEP, key=None):
+    """
+    Skip repeated frames of stream. Each frame is hashed once (See `Frame.digest`), frames aren't compared
+    pixel by pixel. Skipped frames are released (See `FramePool`).
+
+    Parameters
+    ----------
+    frames: iterable
+        Frames or items, which contain frame (See `key`).
+
+    window: int | None
+        Frame is repeated if its digest is one of last `window` distinct digests. 1=same as previous frame
+        (static view). None=all digests of stream are kept.
+
+    luma: bool, step: int
+        Digest of sampled luma plane. See `Frame.digest`.
+
+    key: callable | None
+        Get frame from item. Ex: `lambda item: item[1]` for (pts, frame) of TimestampedFrameReader.
+
+    Examples:
+        for frame in dedupe(capture.run(), luma=True):
+            ...
+    """
+    if window is not None and window < 1:
+        raise ValueError("window must be >= 1.")
+
+    seen = OrderedDict()
+    for item in frames:
+        frame = item if key is None else key(item)
+        digest = frame.digest(luma, step)
+        if digest in seen:
+            seen.move_to_end(digest)
+            frame.release()
+            continue
+
+        seen[digest] = None
+        if window is not None and len(seen) > window:
+            seen.popitem(last=False)
+        yield item
+
+
 class ProcessHandler(object):
     def __init__(self, process, chunk_size=CHUNK_DEFAULT):
         if not isinstance(process, Subprocess):
@@ -178,23 +385,95 @@ class ProcessHandler(object):
     def is_alive(self):
         return self._process.is_alive()
 
+    def fileno(self):
+        """File descriptor of stdout, Ex: for `selectors`."""
+        return self._process.stdout.fileno()
+
+    @property
+    def returncode(self):
+        return self._process.poll()
+
+    @property
+    def pipe_size(self):
+        """Capacity of stdout pipe. None=system default."""
+        return self._process.pipe_size
+
+    @property
+    def command(self):
+        """Command line of process, pass it to `run(args=...)` to restart without rebuilding."""
+        return self._process.command
+
+    @property
+    def last_read(self):
+        """`time.monotonic()` when data is read from stdout last time. None=nothing is read."""
+        return self._process.last_read
+
+    @property
+    def progress(self):
+        """
+        Latest ProgressInfo snapshot (fps, speed, size, dropped/duplicated frames, ...).
+        None if progress isn't enabled (see `FFmpeg.run`) or nothing is reported yet.
+        """
+        if self._process.progress_reader is None:
+            return None
+        return self._process.progress_reader.progress
+
+    def add_progress_callback(self, callback):
+        if self._process.progress_reader is None:
+            raise RuntimeError("Progress isn't enabled. Run process with `progress`.")
+        self._process.progress_reader.add_callback(callback)
+
     def read(self, chunk_size=-1):
         if chunk_size < 0:
             chunk_size = self.chunk_size
         return self._process.read(chunk_size)
 
-    def write(self, data):
+    def write(self, data, release=False):
+        """
+        Write data to stdin. Frame is written without copy, `release`: return frame's buffer to pool after write.
+        """
+        if isinstance(data, Frame):
+            self._process.write(memoryview(data.data_frame).cast("B"))
+            if release:
+                data.release()
+            return
         self._process.write(data)
 
+    @property
+    def log_reader(self):
+        """LogReader of process. None if stderr isn't captured (see `FFmpeg.run`)."""
+        return self._process.log_reader
+
+    def logs(self, min_level=None):
+        """
+        Recent log lines of process: list of (timestamp, level, message).
+        Lines less severe than `min_level` are skipped. See `LogReader.lines`
+        """
+        if self._process.log_reader is None:
+            return []
+        return self._process.log_reader.lines(min_level)
+
     def stop(self):
+        # in-memory input: stdin is owned by writer, process ends at end of data.
         _, errs = self._process.communicate("q".encode())
+        if self._process.stdin_writer is not None:
+            self._process.stdin_writer.wait()
 
-        if errs:
-            raise RuntimeError(errs)
+        if self._process.log_reader is None:
+            if errs:
+                raise RuntimeError(errs)
+            return
+
+        # ffmpeg reports non-fatal warnings on stderr too, only exit code means failure.
+        if self._process.returncode != 0:
+            raise self._process.error(f"Process exited - code {self._process.returncode}")
 
     def kill(self):
         return self._process.kill()
 
+    def wait(self, timeout=None):
+        return self._process.wait(timeout)
+
 
 class DataHandler(ProcessHandler):
     def read(self, chunk_size=-1):
@@ -202,21 +481,256 @@ class DataHandler(ProcessHandler):
 
 
 class FrameReader(ProcessHandler):
-    def __init__(self, process, frame_size):
+    """
+    Read raw frames from stdout of process.
+
+    Parameters
+    ----------
+    process: Subprocess
+
+    frame_size: tuple
+        (width, height)
+
+    pipe_size: int | None
+        Capacity of stdout pipe. None=system default.
+
+    pool: FramePool | None
+        Frames are read into buffers of pool. Release frames to recycle buffers.
+    """
+
+    def __init__(self, process, frame_size, pipe_size=None, pool=None):
         super().__init__(process, frame_size[0] * frame_size[1] * 3)
+        self.pool = pool
 
         # if pixel_fmt in (PixelFormat.RGB24, PixelFormat.RGB24):
         # TODO: work with ARGB, RGBA, ABGR, BGRA (4 channels)
         self.frame_size = frame_size
 
+        if pipe_size:
+            process.set_pipe_size(pipe_size)
+
     def get_frame(self):
-        frame_bytes = super().read()
-        if frame_bytes:
-            return Frame(frame_bytes, self.frame_size, dtype=numpy.uint8)
+        # read straight into frame's array, frame is filled by few reads whatever chunk size.
+        if self.pool is None:
+            buffer = numpy.empty(self.chunk_size, dtype=numpy.uint8)
+        else:
+            buffer = self.pool.acquire((self.chunk_size,), numpy.uint8)
+
+        if self._process.readinto(buffer) == self.chunk_size:
+            return Frame(buffer, self.frame_size, pool=self.pool)
+
+        if self.pool is not None:
+            self.pool.release(buffer)
+
+    def write(self, data):
+        raise AttributeError
+
+
+class FrameTimestamps(object):
+    """
+    Log listener, which collect presentation timestamps of `showinfo` filter in order of frames.
+    Pass to `FFmpeg.run(log_listeners=...)`, so no timestamp is missed.
+    """
+
+    def __init__(self):
+        self.__timestamps = queue.Queue()
+
+    def __call__(self, level, message):
+        if RE_SHOWINFO_LINE.search(message) is None:
+            return False
+
+        matched = RE_SHOWINFO.search(message)
+        if matched is not None:
+            pts_time = matched.group(2)
+            self.__timestamps.put(None if pts_time in ("NOPTS", "nan") else float(pts_time))
+        # consumed, lines of every frame mustn't evict other lines of log.
+        return True
+
+    def __len__(self):
+        """Number of timestamps, which aren't taken by `get`."""
+        return self.__timestamps.qsize()
+
+    def get(self, timeout=TIMESTAMP_TIMEOUT):
+        try:
+            return self.__timestamps.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError("Timestamp of frame isn't reported. Require `showinfo` is last video filter.")
+
+
+class TimestampedFrameReader(FrameReader):
+    """
+    Read (pts, frame) from stdout of process.
+
+    Timestamps are parsed from `showinfo` filter on stderr of the same process, nothing is decoded twice.
+    Process must output one frame per filtered frame (`-vsync passthrough`, no `-r`) and log at least info level.
+    See `VideoCapture.run(timestamps=True)`
+
+    Parameters
+    ----------
+    timestamps: FrameTimestamps
+        Listener of process's log.
+    """
+
+    def __init__(self, process, frame_size, timestamps, pipe_size=None, pool=None):
+        super().__init__(process, frame_size, pipe_size, pool)
+        self.timestamps = timestamps
+
+    def get_frame(self):
+        """
+        Returns
+        -------
+            (pts, Frame). pts: presentation timestamp (seconds), None if frame hasn't timestamp.
+            None at end of stream.
+        """
+        frame = super().get_frame()
+        if frame is None:
+            return None
+        return self.timestamps.get(), frame
+
+
+class LatestFrameReader(FrameReader):
+    """
+    Drain frames continuously in background and keep only the newest one.
+    Latency is bounded whatever speed of consumer, frames which aren't read in time are dropped.
+
+    Attributes
+    ----------
+    dropped: int
+        Total dropped frames.
+    """
+
+    def __init__(self, process, frame_size, pipe_size=None, pool=None):
+        super().__init__(process, frame_size, pipe_size, pool)
+        self.dropped = 0
+
+        self.__frame = None
+        self.__received = 0.
+        self.__dropped = 0
+        self.__ended = False
+        self.__exception = None
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__drain, name=f"{self.__class__.__name__}-{process.pid}",
+                                         daemon=True)
+        self.__thread.start()
+
+    def __drain(self):
+        try:
+            while True:
+                frame = super().get_frame()
+                if frame is None:
+                    break
+
+                with self.__condition:
+                    if self.__frame is not None:
+                        self.__frame.release()
+                        self.__dropped += 1
+                        self.dropped += 1
+                    self.__frame = frame
+                    self.__received = time.monotonic()
+                    self.__condition.notify_all()
+        except Exception as e:
+            self.__exception = e
+        finally:
+            with self.__condition:
+                self.__ended = True
+                self.__condition.notify_all()
+
+    def get_frame(self, timeout=None):
+        """
+        Wait newest frame, which isn't read yet.
+
+        Returns
+        -------
+            (Frame, age, dropped). age: seconds since frame was received from pipe,
+            dropped: frames dropped since last read. None at end of stream.
+
+        Raises
+        ------
+        TimeoutError:
+            No new frame in `timeout` seconds.
+        """
+        with self.__condition:
+            if not self.__condition.wait_for(lambda: self.__frame is not None or self.__ended, timeout):
+                raise TimeoutError(f"No frame in {timeout} seconds.")
+
+            if self.__frame is None:
+                if self.__exception is not None:
+                    raise self.__exception
+                return None
+
+            frame, received, dropped = self.__frame, self.__received, self.__dropped
+            self.__frame = None
+            self.__dropped = 0
+        return frame, time.monotonic() - received, dropped
+
+
+class PassthroughHandler(ProcessHandler):
+    """
+    Forward stdout of process to file descriptor in background. Data isn't copied to Python memory
+    on Linux (see `passthrough`). Ex: relay stream copy mpegts to recorder or socket.
+
+    Parameters
+    ----------
+    process: Subprocess
+
+    dst: int | file-like
+        File descriptor or object has `fileno()` (file, socket, ...). Caller owns dst, it isn't closed.
+
+    Attributes
+    ----------
+    bytes_moved: int
+        Bytes forwarded. Available after process exit.
+    """
+
+    def __init__(self, process, dst, chunk_size=PASSTHROUGH_CHUNK):
+        super().__init__(process, chunk_size)
+        if process.stdout is None:
+            raise RuntimeError("Process hasn't stdout pipe.")
+
+        self.dst = dst.fileno() if hasattr(dst, "fileno") else dst
+        if not isinstance(self.dst, int):
+            raise TypeError("dst must be file descriptor or has `fileno()`.")
+
+        self.bytes_moved = 0
+        self.__exception = None
+        self.__thread = threading.Thread(target=self.__run, name=f"{self.__class__.__name__}-{self.dst}",
+                                         daemon=True)
+
+    def __run(self):
+        try:
+            self.bytes_moved = passthrough(self._process.stdout.fileno(), self.dst, self.chunk_size)
+            if self._process.wait() != 0:
+                raise self._process.error(f"Process exited - code {self._process.returncode}")
+        except Exception as e:
+            self.__exception = e
+
+    def start(self):
+        self.__thread.start()
+        return self
+
+    def join(self, timeout=None):
+        """Wait until all data is forwarded. Re-raise error of forwarding or process."""
+        self.__thread.join(timeout)
+        if self.__exception is not None:
+            raise self.__exception
+
+    def read(self, chunk_size=-1):
+        raise AttributeError("Data is forwarded to dst.")
 
     def write(self, data):
         raise AttributeError
 
+    def stop(self):
+        # communicate() would read stdout, which is owned by forwarding thread.
+        stdin = self._process.stdin
+        if stdin is not None and not stdin.closed:
+            try:
+                stdin.write("q".encode())
+                stdin.close()
+            except BrokenPipeError:
+                pass
+        self.join()
+
 
 class Capture(object):
     """
@@ -229,11 +743,14 @@ class Capture(object):
 
     output: None | str | -1
         Output destination (None=Not set, str=URI, '-1'=PIPE_LINE)
+
+    demuxer: Demuxer | None
+        Input format of source. Ex: LavfiDemuxer. None=guess from source.
     """
 
-    def __init__(self, src, output=None):
-        self.probe = FFprobe(src)
-        input_stream = InputStream(src)
+    def __init__(self, src, output=None, demuxer=None):
+        self.probe = FFprobe(src, demuxer)
+        input_stream = InputStream(src, demuxer=demuxer)
 
         if output:
             self.mpeg = FFmpeg(input_stream, OutputStream(output))
@@ -276,8 +793,20 @@ class Capture(object):
         self.mpeg.source = source
         self.probe.path = source
 
-    def start(self):
-        self.process = ProcessHandler(self.mpeg.run())
+    def start(self, progress=None):
+        self.process = ProcessHandler(self.mpeg.run(progress=progress))
+
+    def passthrough(self, dst, progress=None):
+        """
+        Start process and forward its pipe output to `dst` in background. See `PassthroughHandler`
+
+        Output must be PIPE_LINE, Ex: stream copy (CopyCoding) to mpegts.
+        """
+        if not any(output_stream.path == PIPE_LINE for output_stream in self.mpeg.output_streams):
+            raise RuntimeError("Require PIPE_LINE output.")
+
+        self.process = PassthroughHandler(self.mpeg.run(progress=progress), dst)
+        return self.process.start()
 
     def release(self):
         if self.process is None:
@@ -286,12 +815,57 @@ class Capture(object):
         self.process.stop()
         self.__process_handler = None
 
+    def kill(self):
+        """Kill process immediately, Ex: it's stalled. Capture can be started again."""
+        if self.process is None:
+            return
+
+        self.process.kill()
+        self.process.wait()
+        self.__process_handler = None
+
 
 class VideoCapture(Capture):
-    def __init__(self, src, fps=FPS_DEFAULT, pix_fmt=PixelFormat.BGR24):
-        super().__init__(src, PIPE_LINE)
+    """
+    Capture raw frames of source.
+
+    Geometry is applied by ffmpeg before pipe: decode at lower resolution (`lowres`), `crop`, then scale to
+    `target_size`. Pipe bandwidth and work of Python follow output area.
+
+    Parameters
+    ----------
+    target_size: tuple | None
+        (width, height) of output frames. One of them is None: keep aspect ratio. None=no scaling.
+
+    interpolation: str | None
+        Scaling algorithm. See `Interpolation`
+
+    crop: tuple | None
+        Region of interest (x, y, width, height) in source's coordinates.
+
+    lowres: int | None
+        Decode at 1/2^lowres resolution. Only some decoders support it (Ex: mjpeg, mpeg2video),
+        output geometry is the same either way.
+
+    pool: FramePool | None
+        Frames are read into buffers of pool, release frames to recycle them. See `FramePool`
+    """
+
+    def __init__(self, src, fps=FPS_DEFAULT, pix_fmt=PixelFormat.BGR24, demuxer=None,
+                 target_size=None, interpolation=None, crop=None, lowres=None, pool=None):
+        super().__init__(src, PIPE_LINE, demuxer)
         self.read_probe()
 
+        if interpolation is not None and interpolation not in Interpolation:
+            raise ValueError(f"interpolation must be in {list(Interpolation)}.")
+
+        self.target_size = target_size
+        self.interpolation = interpolation
+        self.crop = crop
+        self.lowres = lowres
+        self.pool = pool
+        self.__geometry_applied = False
+
         self.mpeg.input_stream.re = None
         self.mpeg.output_stream.muxer = RawVideo()
         self.mpeg.output_stream.codec = EncodeVideo()
@@ -307,30 +881,206 @@ class VideoCapture(Capture):
         super(VideoCapture, self.__class__).src.fset(self, source)
         self.probe.refresh()
 
-    def run(self):
+    @property
+    def frame_size(self):
+        """(width, height) of output frames."""
+        width, height = self.__crop_size()
+        if self.lowres:
+            factor = 1 << self.lowres
+            width, height = -(-width // factor), -(-height // factor)
+
+        if self.target_size is None:
+            return width, height
+
+        target_width, target_height = self.target_size
+        if target_width is None and target_height is None:
+            raise ValueError("target_size require width or height.")
+
+        # even size, required by most pixel formats.
+        if target_width is None:
+            target_width = max(2, int(round(target_height * width / height / 2)) * 2)
+        if target_height is None:
+            target_height = max(2, int(round(target_width * height / width / 2)) * 2)
+        return target_width, target_height
+
+    def __crop_size(self):
+        width, height = self.probe.info.size
+        if self.crop is None:
+            return width, height
+
+        x, y, crop_width, crop_height = self.crop
+        if x < 0 or y < 0 or crop_width <= 0 or crop_height <= 0 \
+                or x + crop_width > width or y + crop_height > height:
+            raise ValueError(f"Crop {self.crop} is out of frame {width}x{height}.")
+        return crop_width, crop_height
+
+    def __apply_geometry(self):
+        if self.__geometry_applied:
+            return
+
+        width, height = self.probe.info.size
+        frame_size = self.frame_size
+        output_stream = self.mpeg.output_stream
+
+        if self.lowres:
+            self.mpeg.input_stream.codec.lowres = self.lowres
+
+        if self.crop is not None:
+            # relative to decoded size, which is smaller if decoder supports lowres.
+            x, y, crop_width, crop_height = self.crop
+            output_stream.add_video_filter(f"crop=iw*{crop_width}/{width}:ih*{crop_height}/{height}"
+                                           f":iw*{x}/{width}:ih*{y}/{height}")
+
+        # lowres: always scale, so geometry doesn't depend on decoder.
+        if self.target_size is not None or self.lowres:
+            scale = f"scale={frame_size[0]}:{frame_size[1]}"
+            if self.interpolation is not None:
+                scale += f":flags={self.interpolation}"
+            output_stream.add_video_filter(scale)
+        self.__geometry_applied = True
+
+    def run(self, progress=None, pipe_size=None, timestamps=False, log_thread=True, args=None):
+        """
+        Start capturing.
+
+        Parameters
+        ----------
+        pipe_size: int | None
+            Capacity of stdout pipe. None=system default.
+
+        timestamps: bool
+            Read (pts, frame) instead of frame. Every decoded frame is output (no frame rate conversion).
+            Cost: one log line per frame, parsed in log reader. See `TimestampedFrameReader`
+
+        log_thread: bool
+            Drain stderr in LogReader thread. See `FFmpeg.run`
+
+        args: list of str | None
+            Command line to reuse, Ex: `process.command` of previous run. See `FFmpeg.run`
+        """
         if self.process is not None:
             raise AttributeError("Process's already existed.")
-        self.process = FrameReader(self.mpeg.run(), self.probe.info.size)
+
+        self.__apply_geometry()
+        if not timestamps:
+            process = self.mpeg.run(progress=progress, log_thread=log_thread, args=args)
+            self.process = self._frame_reader(process, pipe_size)
+            return self.process
+
+        # showinfo, sync and log level apply to this run only, options of capture are restored after start.
+        output_stream = self.mpeg.output_stream
+        stream_options = _snapshot(output_stream, TIMESTAMP_STREAM_OPTIONS)
+        mpeg_options = _snapshot(self.mpeg, ("loglevel",))
+
+        filters = []
+        if output_stream.is_set(OutputStream.video_filter):
+            filters = [_filter.split("=")[0] for _filter in output_stream.video_filter.split(",")]
+        if SHOWINFO not in filters:
+            output_stream.add_video_filter(SHOWINFO_FILTER)
+        if output_stream.is_set(OutputStream.frame_rate):
+            del output_stream.frame_rate
+        output_stream.video_sync = VSync.PASSTHROUGH
+        # showinfo logs at info level.
+        if mpeg_options.get("loglevel") in LOG_LEVELS_BELOW_INFO:
+            self.mpeg.loglevel = LogLevel.INFO
+
+        frame_timestamps = FrameTimestamps()
+        try:
+            process = self.mpeg.run(progress=progress, log_listeners=[frame_timestamps], log_thread=log_thread,
+                                    args=args)
+        finally:
+            _restore(output_stream, TIMESTAMP_STREAM_OPTIONS, stream_options)
+            _restore(self.mpeg, ("loglevel",), mpeg_options)
+        self.process = TimestampedFrameReader(process, self.frame_size, frame_timestamps, pipe_size, self.pool)
         return self.process
 
+    def _frame_reader(self, process, pipe_size):
+        return FrameReader(process, self.frame_size, pipe_size, self.pool)
+
     def read(self, **kwargs):
         return self.process.get_frame()
 
+    def keyframes(self):
+        """
+        Capture keyframes only. Other frames are skipped by decoder (`-skip_frame nokey`), they are never decoded.
+        """
+        self.mpeg.input_stream.codec.skip_frame = Discard.NONKEY
+        self.mpeg.output_stream.variable_frame_rate()
+        self._unthrottle()
+
+    def decimate(self, fps):
+        """
+        Capture `fps` frames per second. Ex: 1/5 = one frame every 5 seconds.
+        Frames are dropped before scaling and pixel format conversion.
+        """
+        if fps <= 0:
+            raise ValueError("fps must be > 0.")
+
+        self.__prepend_video_filter(f"fps={fps}")
+        self.mpeg.output_stream.variable_frame_rate()
+        self._unthrottle()
+
+    def select(self, expr):
+        """
+        Capture frames, which match `select` filter's expression. Ex: "eq(pict_type,I)", "not(mod(n,100))"
+        See: https://ffmpeg.org/ffmpeg-filters.html#select_002c-aselect
+        """
+        self.__prepend_video_filter(f"select='{expr}'")
+        self.mpeg.output_stream.variable_frame_rate()
+        self._unthrottle()
+
+    def drop_static(self, hi=None, lo=None, frac=None, max_drop=None):
+        """
+        Capture only frames, which differ from previous captured frame (`mpdecimate`). Frames of static scene
+        are dropped by ffmpeg, they are never scaled, converted or piped. See `OutputOptions.drop_static`
+        """
+        self.mpeg.output_stream.drop_static(hi, lo, frac, max_drop)
+
+    @property
+    def skipped(self):
+        """
+        Estimated frames dropped by ffmpeg (`drop_static`, `decimate`, `select`) so far.
+        None unless process runs with `progress` and frame rate of source is known.
+        See `ProgressInfo.skipped_frames`
+        """
+        progress = self.process.progress if self.process is not None else None
+        if progress is None:
+            return None
+
+        info = self.probe.info
+        if not info.is_set(ProbeInfo.r_frame_rate) or not info.r_frame_rate:
+            return None
+        return progress.skipped_frames(info.r_frame_rate)
+
+    def _unthrottle(self):
+        # scan modes and live sources are read as fast as possible, `-re` would limit them to realtime.
+        input_stream = self.mpeg.input_stream
+        if input_stream.is_set(InputStream.re):
+            del input_stream.re
+
+    def __prepend_video_filter(self, video_filter):
+        # drop frames before other filters, so dropped frames aren't converted.
+        self.mpeg.output_stream.prepend_video_filter(video_filter)
+
     def preview(self, window_name=None, window_size=(800, 600), capture_frame=False, prefix="", postfix="",
-                compress_type=ENCODE_JPEG, quality=DEFAULT_QUALITY, over_write=False):
+                compress_type=None, quality=None, over_write=False):
 
         if window_name is None:
             window_name = self.mpeg.input_stream.path
 
         start_time = 0
         frame_count = 0
-        new_size = (window_size[0], int(round(window_size[0] / self.probe.info.width * self.probe.info.height)))
+        width, height = self.frame_size
+        new_size = (window_size[0], int(round(window_size[0] / width * height)))
 
         for frame in self:
             if not start_time:
                 start_time = time.time()
 
-            frame_preview = cv2.resize(frame.data_frame, new_size)
+            frame_preview = frame.data_frame
+            if new_size != (width, height):
+                # set `target_size` to window size, so frame is scaled by ffmpeg instead.
+                frame_preview = cv2.resize(frame_preview, new_size)
             cv2.imshow(window_name, frame_preview)
             frame_count += 1
 
@@ -348,22 +1098,84 @@ class VideoCapture(Capture):
         return int(round(frame_count / (time.time() - start_time)))
 
 
+class LiveCapture(VideoCapture):
+    """
+    Low-latency capture of live source (RTSP, camera, ...). `read()` returns the newest frame,
+    see `LatestFrameReader`
+
+    Demuxer doesn't buffer (`fflags nobuffer`), streams are detected from few data (`probesize`,
+    `analyzeduration`) and decoder output frames immediately (`flags low_delay`). Frames aren't duplicated
+    to any frame rate.
+    """
+
+    def __init__(self, src, pix_fmt=PixelFormat.BGR24, demuxer=None, probesize=LIVE_PROBESIZE,
+                 analyzeduration=LIVE_ANALYZEDURATION, **kwargs):
+        super().__init__(src, None, pix_fmt, demuxer, **kwargs)
+
+        input_stream = self.mpeg.input_stream
+        input_stream.muxer.fflags = FFlagsDemuxer.nobuffer
+        input_stream.muxer.probesize = probesize
+        input_stream.muxer.analyzeduration = analyzeduration
+        input_stream.codec.flags = GenericFlags.LOW_DELAY
+        self.mpeg.output_stream.video_sync = VSync.PASSTHROUGH
+        # live source is paced by itself, `-re` would only add latency.
+        self._unthrottle()
+
+    def run(self, progress=None, pipe_size=None, timestamps=False, log_thread=True, args=None):
+        if timestamps:
+            raise ValueError("Timestamps aren't supported by live capture.")
+        return super().run(progress, pipe_size, log_thread=log_thread, args=args)
+
+    def _frame_reader(self, process, pipe_size):
+        return LatestFrameReader(process, self.frame_size, pipe_size, self.pool)
+
+    def read(self, timeout=None, **kwargs):
+        """(Frame, age, dropped) of newest frame. See `LatestFrameReader.get_frame`"""
+        return self.process.get_frame(timeout)
+
+
 class VideoWriter(Capture):
     def __init__(self, src):
         super().__init__(src)
 
-    def write(self, *outputs, muxer=None, codec=None, overwrite=False):
-        for output in outputs:
-            output_stream = OutputStream(output, codec=codec, muxer=muxer)
+    def write(self, *outputs, muxer=None, codec=None, overwrite=False, tee=False):
+        """
+        Add outputs.
 
+        Parameters
+        ----------
+        outputs: str | TeeSlave
+            Output URIs. TeeSlave only with `tee`.
+
+        tee: bool
+            Encode once and write all outputs by tee muxer, instead of one encode per output.
+            Output of str is written with `muxer` and onfail=ignore: failed output doesn't stop others.
+        """
+        if tee:
+            output_streams = [self.__tee_output(outputs, muxer, codec)]
+        else:
+            output_streams = [OutputStream(output, codec=codec, muxer=muxer) for output in outputs]
+
+        for output_stream in output_streams:
             if overwrite:
                 output_stream.overwrite = None
 
-            if self.mpeg.input_stream.muxer.format == FormatDemux.V4L2 \
+            if self.mpeg.input_stream.muxer.format == FormatDemuxer.V4L2 \
                     or not codec or codec.codeclib == EncodeVideoLIB.COPY:
                 del output_stream.codec.codeclib
             self.mpeg.add_output(output_stream)
 
+    @staticmethod
+    def __tee_output(outputs, muxer, codec):
+        tee = Tee()
+        for output in outputs:
+            tee.add(output if isinstance(output, TeeSlave) else TeeSlave(output, muxer, TeeOnFail.IGNORE))
+
+        output_stream = OutputStream(tee.path(), codec=codec, muxer=tee)
+        # tee muxer doesn't select streams itself.
+        output_stream.map("v?", "a?")
+        return output_stream
+
 
 class VideoGenerator(object):
     # @TODO(tindang97-ai): video generator from images
@@ -1,6 +1,5 @@
-from ffmpegpy.util.pyopt import option, Option
 from ffmpegpy.codecs.coding import Encoding, Decoding, Codec
-from ffmpegpy.codecs.stream import Audio
+from ffmpegpy.codecs.stream import Audio, StreamType, stream_option
 
 __all__ = [
     "AudioCodec", "AudioDecoding", "AudioEncoding"
@@ -8,9 +7,7 @@ __all__ = [
 
 
 def aoption(opt):
-    if not isinstance(opt, Option):
-        raise TypeError("opt must be Option")
-    return option(f"{opt.name}:a", opt.set_filter, opt.default_value, opt.doc)
+    return stream_option(opt, StreamType.AUDIO)
 
 
 class AudioCodec(Codec):
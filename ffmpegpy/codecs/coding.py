@@ -6,7 +6,7 @@ from ..util import set_flags
 __all__ = [
     "Codec", "Decoding", "Encoding",
     "GenericFlags", "GenericFlags2",
-    "Strict", "MotionEstimation", "ErrDetectFlags"
+    "Strict", "MotionEstimation", "ErrDetectFlags", "Discard"
 ]
 """
 ffmpegpy -hide_banner -h encoder=$(codecs)
@@ -107,6 +107,19 @@ class Strict(ConstantClass):
     EXPERIMENTAL = "experimental"
 
 
+class Discard(ConstantClass):
+    """
+    See: https://ffmpeg.org/ffmpeg-codecs.html -> skip_frame
+    """
+    NONE = "none"
+    DEFAULT = "default"
+    NONREF = "noref"
+    BIDIR = "bidir"
+    NONINTRA = "nointra"
+    NONKEY = "nokey"
+    ALL = "all"
+
+
 class Coding(Options):
     strict = option(
         "strict",
@@ -129,6 +142,16 @@ class Decoding(Coding):
         set_flags(ErrDetectFlags),
         Flags(limit_list=ErrDetectFlags),
         doc="Set error detection flags.")
+    skip_frame = option(
+        "skip_frame",
+        in_list_filter(Discard),
+        doc="Frames are skipped by decoder, they are never decoded. Ex: `nokey` decode keyframes only."
+    )
+    skip_loop_filter = option(
+        "skip_loop_filter",
+        in_list_filter(Discard),
+        doc="Skip loop filtering of frames. Faster decoding, lower quality."
+    )
 
 
 class Encoding(Coding):
@@ -1,10 +1,89 @@
-from ..util.pyopt import Options
+from ..util.pyopt import Options, Option, option
+from ..util.constant import ConstantClass
 
 __all__ = [
-    "Video", "Audio", "Subtitle"
+    "Video", "Audio", "Subtitle",
+    "StreamType", "stream_specifier", "stream_option", "specify_options"
 ]
 
 
+class StreamType(ConstantClass):
+    """
+    See: https://ffmpeg.org/ffmpeg.html#Stream-specifiers-1
+    """
+    VIDEO = "v"
+    AUDIO = "a"
+    SUBTITLE = "s"
+    DATA = "d"
+    ATTACHMENT = "t"
+
+
+def stream_specifier(stream_type=None, index=None, input_index=None):
+    """
+    Build stream specifier.
+
+    Parameters
+    ----------
+    stream_type: str | None
+        StreamType. None=any stream type, `index` is absolute stream index.
+
+    index: int | None
+        Index of stream (in stream type if set).
+
+    input_index: int | None
+        Index of input file. Required by `-map`.
+
+    Examples
+    --------
+    stream_specifier(StreamType.AUDIO, 0) -> "a:0"
+    stream_specifier(index=3, input_index=0) -> "0:3"
+    """
+    specifier = []
+    if input_index is not None:
+        specifier.append(f"{int(input_index)}")
+
+    if stream_type is not None:
+        if stream_type not in StreamType:
+            raise ValueError(f"Stream type must in {StreamType}. Got {stream_type}")
+        specifier.append(stream_type)
+
+    if index is not None:
+        if index < 0:
+            raise ValueError("Stream index must be >= 0.")
+        specifier.append(f"{int(index)}")
+
+    if not specifier:
+        raise ValueError("Empty stream specifier.")
+    return ":".join(specifier)
+
+
+def _strip_specifier(name):
+    name, *specifier = name.split(":", 1)
+    return name
+
+
+def stream_option(opt, specifier):
+    """Clone option for streams matched by `specifier`. Ex: `b` -> `b:a:0`"""
+    if not isinstance(opt, Option):
+        raise TypeError("opt must be Option")
+    return option(f"{_strip_specifier(opt.name)}:{specifier}", opt.set_filter, opt.default_value, opt.doc)
+
+
+def specify_options(options, specifier):
+    """
+    Apply stream specifier to all options name. Old specifier (`:v`, `:a`) will be replaced.
+
+    Parameters
+    ----------
+    options: dict
+        Options (name=value), which is result of `Options.build()`
+
+    specifier: str
+        Stream specifier. See `stream_specifier`
+    """
+    return {f"{_strip_specifier(name)}:{specifier}": value for name, value in options.items()}
+
+
 class Video(Options):
     """Video Stream Options"""
 
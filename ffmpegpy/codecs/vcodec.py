@@ -1,6 +1,6 @@
-from ffmpegpy.util.pyopt import option, Option, min_value_filter, in_range_filter, type_filter
+from ffmpegpy.util.pyopt import option, min_value_filter, in_range_filter, type_filter
 from ffmpegpy.codecs.coding import Encoding, Decoding, Codec
-from ffmpegpy.codecs.stream import Video
+from ffmpegpy.codecs.stream import Video, StreamType, stream_option
 
 __all__ = [
     "VideoDecoding", "VideoEncoding", "VideoCodec"
@@ -8,9 +8,7 @@ __all__ = [
 
 
 def voption(opt):
-    if not isinstance(opt, Option):
-        raise TypeError("opt must be Option")
-    return option(f"{opt.name}:v", opt.set_filter, opt.default_value, opt.doc)
+    return stream_option(opt, StreamType.VIDEO)
 
 
 class VideoCodec(Codec):
@@ -71,6 +71,11 @@ class NvencCodec(VideoCodec):
     HEVC = "nvenc_h265"
 
 
+def filter_gpu(gpu):
+    # count GPUs at first set instead of import time.
+    return max_value_filter(number_of_gpus())(gpu)
+
+
 class Nvenc(LibX):
     codec = option(
         LibX.codec,
@@ -89,7 +94,7 @@ class Nvenc(LibX):
         doc="Set the encoding level restriction."
     )
 
-    gpu = option("gpu", max_value_filter(number_of_gpus()))
+    gpu = option("gpu", filter_gpu)
     constant_quality = option("cq", in_range_filter(0, 51))
     strict_gop = option("strict_gop", type_filter(bool))
     zerolatency = option("zerolatency", type_filter(bool))
@@ -1,14 +1,15 @@
 import json
 
-from util import convert_kwargs_to_cmd_line_args
-from util.io import Subprocess
-from util.option import Options, option
+from .util import convert_kwargs_to_cmd_line_args
+from .util.io import Subprocess
+from .util.pyopt import Options, option, type_filter
 from .io import InputOptionsBase, RTSPTransport
+from .formats.format import Demuxer
 
 FFPROBE_CMD = "ffprobe"
 
 __all__ = [
-    "ProbeInfo", "FFprobe"
+    "ProbeInfo", "AudioProbeInfo", "FFprobe"
 ]
 
 
@@ -20,24 +21,86 @@ class ProbeOptions(InputOptionsBase):
         return convert_kwargs_to_cmd_line_args(super(ProbeOptions, self).build())
 
 
+# keys of video stream, audio stream has meaningless values of them. Ex: r_frame_rate="0/0"
+VIDEO_KEYS = ("width", "height", "r_frame_rate", "pix_fmt")
+
+
+def _to_rate(_value):
+    # "30000/1001" -> 29.97, "0/0" (unknown) -> 0.
+    numerator, _, denominator = str(_value).partition("/")
+    denominator = float(denominator or 1)
+    return float(numerator) / denominator if denominator else 0.
+
+
+class AudioProbeInfo(Options):
+    """Info of audio stream. See `ProbeInfo.audio`"""
+
+    def __init__(self, stream=None):
+        super().__init__()
+        attrs = {opt.name: attr for attr, opt in self.options()}
+        for k, v in (stream or {}).items():
+            if k in attrs:
+                self.__setattr__(attrs[k], v)
+
+    index = option("index", type_filter(int))
+    codec_name = option("codec_name")
+    sample_rate = option("sample_rate", lambda _value: int(_value))
+    channels = option("channels", lambda _value: int(_value))
+    channel_layout = option("channel_layout")
+    sample_fmt = option("sample_fmt")
+    duration = option("duration", lambda _value: float(_value))
+
+
 class ProbeInfo(Options):
     @property
     def size(self):
         return self.width, self.height
 
+    def audio(self, index=0):
+        """Info of audio stream `index` (in audio streams)."""
+        streams = self.find_streams("audio")
+        if index >= len(streams):
+            raise RuntimeError(f"No audio stream {index} from source!")
+        return AudioProbeInfo(streams[index])
+
+    def find_streams(self, codec_type=None):
+        """
+        Find streams of source by codec type ("video", "audio", "subtitle", "data").
+        Stream's `index` is absolute index, which is used by `-map` and `-discard`.
+        """
+        return [stream for stream in self.streams if codec_type is None or stream['codec_type'] == codec_type]
+
     height = option("height", lambda _value: int(_value))
     width = option("width", lambda _value: int(_value))
-    r_frame_rate = option("r_frame_rate", lambda _value: float(eval(_value)))
+    r_frame_rate = option("r_frame_rate", _to_rate)
     codec_name = option("codec_name")
     pix_fmt = option("pix_fmt")
     tag = option("tag")
+    duration = option("duration", lambda _value: float(_value))
+    nb_frames = option("nb_frames", lambda _value: int(_value))
+    index = option("index", type_filter(int))
+    streams = option("streams", type_filter(list))
     others = option("others")
 
 
 class FFprobe(ProbeOptions):
-    def __init__(self, src):
+    """
+    Parameters
+    ----------
+    src: str | int
+        Source URI. (int=local device)
+
+    demuxer: Demuxer | None
+        Input format of source. Ex: LavfiDemuxer. None=guess from source.
+    """
+
+    def __init__(self, src, demuxer=None):
         super().__init__()
+        if demuxer is not None and not isinstance(demuxer, Demuxer):
+            raise TypeError("demuxer must be Demuxer.")
+
         self.path = src
+        self.demuxer = demuxer
         self.__probe_info = ProbeInfo()
 
     @property
@@ -69,32 +132,81 @@ class FFprobe(ProbeOptions):
         cmd = [FFPROBE_CMD]
         cmd += super().build()
         cmd += ['-show_format', '-show_streams', '-of', 'json']
-        cmd.append(self.path)
+        cmd += self.__input()
         return cmd
 
     def refresh(self):
         self.__probe_info = self.__read(self.build())
 
-    @staticmethod
-    def __read(cmd) -> ProbeInfo:
-        # TODO: work with audio stream.
+    def packets(self, stream="v:0"):
+        """
+        Read packets of stream without decoding.
+
+        Parameters
+        ----------
+        stream: str
+            Stream specifier. Default: first video stream.
+
+        Returns
+        -------
+            List of (pts_time, is_keyframe). Packets without pts are ignored.
+        """
+        cmd = [FFPROBE_CMD]
+        cmd += super().build()
+        cmd += ['-select_streams', stream, '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0']
+        cmd += self.__input()
+
+        packets = []
+        for line in self.__run(cmd).splitlines():
+            pts_time, _, flags = line.strip().partition(",")
+            if not pts_time or pts_time == "N/A":
+                continue
+            packets.append((float(pts_time), "K" in flags))
+        packets.sort()
+        return packets
+
+    def keyframes(self, stream="v:0"):
+        """Presentation timestamps (seconds) of keyframes. Read from packets, so nothing is decoded."""
+        return [pts_time for pts_time, is_keyframe in self.packets(stream) if is_keyframe]
+
+    def __input(self):
+        if self.demuxer is None:
+            return [self.path]
+        return convert_kwargs_to_cmd_line_args(self.demuxer.build()) + ['-i', self.path]
 
+    @staticmethod
+    def __run(cmd) -> str:
         probe = Subprocess(cmd, stdout=Subprocess.PIPE, stderr=Subprocess.PIPE)
         out, err = probe.communicate()
         if probe.returncode != 0:
             raise RuntimeError(f'(FFprobe error {probe.returncode}) {err.decode().strip()}')
+        return out.decode('utf-8')
 
-        info = json.loads(out.decode('utf-8'))
+    @staticmethod
+    def __read(cmd) -> ProbeInfo:
+        probe = json.loads(FFprobe.__run(cmd))
+        streams = probe['streams']
 
+        # audio only source: info of first audio stream, see `ProbeInfo.audio`
         try:
-            info = next(stream for stream in info['streams'] if stream['codec_type'] == "video")
+            info = next(stream for codec_type in ("video", "audio")
+                        for stream in streams if stream['codec_type'] == codec_type)
         except StopIteration:
-            raise RuntimeError("No video stream from source!")
+            raise RuntimeError("No video or audio stream from source!")
+
+        # some containers (mkv, webm) only have duration of format.
+        if 'duration' not in info and 'duration' in probe.get('format', {}):
+            info['duration'] = probe['format']['duration']
 
         probe_info = ProbeInfo()
+        probe_info.streams = streams
+        is_audio = info['codec_type'] == "audio"
+        attrs = {opt.name: attr for attr, opt in probe_info.options()}
         for k, v in info.copy().items():
-            if probe_info.__contains__(k):
-                probe_info.__setattr__(k, v)
+            if is_audio and k in VIDEO_KEYS:
+                continue
+            if k in attrs:
+                probe_info.__setattr__(attrs[k], v)
                 info.__delitem__(k)
 
         probe_info.others = info
@@ -0,0 +1,32 @@
+from .format import Demuxer, FormatDemuxer
+from ffmpegpy.util.pyopt import option, in_list_filter
+
+__all__ = [
+    'ConcatDemuxer', 'write_concat_list'
+]
+
+
+def write_concat_list(file_path, paths):
+    """
+    Write file list of concat demuxer.
+    See: https://ffmpeg.org/ffmpeg-formats.html#concat-1
+    """
+    with open(file_path, "w") as f:
+        f.write("ffconcat version 1.0\n")
+        for path in paths:
+            escaped_path = path.replace("'", "'\\''")
+            f.write(f"file '{escaped_path}'\n")
+
+
+class ConcatDemuxer(Demuxer):
+    """
+    Concat demuxer. Read list of files, which have same streams, as one input.
+    """
+
+    format = option(
+        Demuxer.format,
+        in_list_filter(FormatDemuxer.CONCAT, ),
+        FormatDemuxer.CONCAT,
+        doc="Concat demuxer"
+    )
+    safe = option("safe", in_list_filter((0, 1)), doc="Accept only safe (relative) file paths. Default: 1")
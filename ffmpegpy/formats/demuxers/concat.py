@@ -0,0 +1,5 @@
+from ..concat import ConcatDemuxer
+
+__all__ = [
+    'ConcatDemuxer'
+]
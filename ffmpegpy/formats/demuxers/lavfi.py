@@ -0,0 +1,5 @@
+from ..lavfi import LavfiDemuxer
+
+__all__ = [
+    'LavfiDemuxer'
+]
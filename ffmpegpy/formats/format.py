@@ -19,6 +19,9 @@ class FormatDevices(ConstantClass):
     # OSX
     AVFOUNDATION = "avfoundation"
 
+    # Libavfilter
+    LAVFI = 'lavfi'
+
 
 class FormatCommon(ConstantClass):
     RAW_VIDEO = 'rawvideo'
@@ -29,13 +32,18 @@ class FormatCommon(ConstantClass):
     HEVC = 'hevc'
     MOV = 'mov'
 
+    # raw PCM (interleaved samples)
+    S16LE = 's16le'
+    F32LE = 'f32le'
+
 
 class FormatDemuxer(FormatDevices, FormatCommon):
-    pass
+    CONCAT = 'concat'
 
 
 class FormatMuxer(FormatDevices, FormatCommon):
-    pass
+    NULL = 'null'
+    TEE = 'tee'
 
 
 class Format(FormatMuxer, FormatDemuxer):
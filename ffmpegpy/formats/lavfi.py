@@ -0,0 +1,42 @@
+from .format import Demuxer, FormatDemuxer
+from ffmpegpy.util.pyopt import option, in_list_filter
+
+__all__ = [
+    'LavfiDemuxer', 'testsrc2', 'sine'
+]
+
+
+def testsrc2(size=(1280, 720), rate=30, duration=None):
+    """
+    Filtergraph of synthetic video source. Input path of LavfiDemuxer.
+    See: https://ffmpeg.org/ffmpeg-filters.html#testsrc
+    """
+    width, height = size
+    graph = f"testsrc2=size={width}x{height}:rate={rate}"
+    if duration is not None:
+        graph += f":duration={duration}"
+    return graph
+
+
+def sine(frequency=1000, sample_rate=48000, duration=None):
+    """
+    Filtergraph of synthetic audio source (sine wave). Input path of LavfiDemuxer.
+    See: https://ffmpeg.org/ffmpeg-filters.html#sine
+    """
+    graph = f"sine=frequency={frequency}:sample_rate={sample_rate}"
+    if duration is not None:
+        graph += f":duration={duration}"
+    return graph
+
+
+class LavfiDemuxer(Demuxer):
+    """
+    Libavfilter input device. Read output of filtergraph as input, so nothing needs media files.
+    """
+
+    format = option(
+        Demuxer.format,
+        in_list_filter(FormatDemuxer.LAVFI, ),
+        FormatDemuxer.LAVFI,
+        doc="Libavfilter input device"
+    )
@@ -2,3 +2,5 @@ from .h264 import *
 from .mp4 import *
 from .segment import *
 from .rawvideo import *
+from .pcm import *
+from .tee import *
@@ -0,0 +1,5 @@
+from ..pcm import PCM, SampleFormat
+
+__all__ = [
+    'PCM', 'SampleFormat'
+]
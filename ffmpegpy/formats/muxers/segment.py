@@ -1 +1 @@
-from ..segment import Segment
+from ..segment import Segment, SegmentListType
@@ -0,0 +1,5 @@
+from ..tee import Tee, TeeSlave, TeeOnFail
+
+__all__ = [
+    'Tee', 'TeeSlave', 'TeeOnFail'
+]
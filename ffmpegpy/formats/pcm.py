@@ -0,0 +1,31 @@
+from .format import Muxer, FormatMuxer
+from ffmpegpy.util.constant import ConstantClass
+from ffmpegpy.util.pyopt import option, in_list_filter
+
+__all__ = [
+    'PCM', 'SampleFormat', 'SAMPLE_DTYPES'
+]
+
+
+class SampleFormat(ConstantClass):
+    """
+    Raw PCM formats: interleaved, little-endian samples. Name of muxer is name of sample format.
+    """
+    S16LE = FormatMuxer.S16LE
+    F32LE = FormatMuxer.F32LE
+
+
+# numpy dtype of samples
+SAMPLE_DTYPES = {
+    SampleFormat.S16LE: "<i2",
+    SampleFormat.F32LE: "<f4",
+}
+
+
+class PCM(Muxer):
+    format = option(
+        Muxer.format,
+        in_list_filter(SampleFormat),
+        SampleFormat.S16LE,
+        doc="Raw PCM muxer"
+    )
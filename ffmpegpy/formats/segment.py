@@ -1,11 +1,23 @@
 from .format import Muxer, FormatMuxer
+from ffmpegpy.util.constant import ConstantClass
 from ffmpegpy.util.pyopt import option, in_list_filter, type_filter, min_value_filter
 
 __all__ = [
-    'Segment'
+    'Segment', 'SegmentListType'
 ]
 
 
+class SegmentListType(ConstantClass):
+    """
+    Format of segment list. CSV line: `filename,start_time,end_time`, written when segment is complete.
+    """
+    FLAT = "flat"
+    CSV = "csv"
+    EXT = "ext"
+    FFCONCAT = "ffconcat"
+    M3U8 = "m3u8"
+
+
 class Segment(Muxer):
     format = option(
         Muxer.format,
@@ -14,7 +26,11 @@ class Segment(Muxer):
     )
     segment_time = option("segment_time", min_value_filter(0))
     segment_format_options = option("segment_format_options", type_filter(str))
-    segment_format = option("segment_format", in_list_filter(FormatMuxer.MP4))
+    segment_format = option("segment_format", in_list_filter([FormatMuxer.MP4, FormatMuxer.MPEGTS]))
+    segment_list = option("segment_list", type_filter(str), doc="List of complete segments. Ex: pipe:N")
+    segment_list_type = option("segment_list_type", in_list_filter(SegmentListType))
+    segment_list_size = option("segment_list_size", min_value_filter(0), doc="Max entries of list. 0=all")
+    segment_list_entry_prefix = option("segment_list_entry_prefix", type_filter(str))
     strftime = option("strftime", in_list_filter([1, 0, '1', '0']))
     reset_timestamps = option("reset_timestamps", in_list_filter((1, 0)))
     segment_atclocktime = option("segment_atclocktime", in_list_filter((1, 0)))
@@ -0,0 +1,131 @@
+from ffmpegpy.util.constant import ConstantClass
+from ffmpegpy.util.pyopt import option, in_list_filter, type_filter
+from .format import Muxer, FormatMuxer
+
+__all__ = [
+    'Tee', 'TeeSlave', 'TeeOnFail'
+]
+
+SLAVE_SEPARATOR = "|"
+# special characters of each parsing level: slave list, then options of slave.
+SLAVE_SPECIAL = "|"
+OPTION_SPECIAL = ":="
+
+
+def _escape(value, special):
+    return "".join(f"\\{char}" if char in special or char in "\\'" else char for char in str(value))
+
+
+class TeeOnFail(ConstantClass):
+    """Action when slave fails. ABORT: stop all outputs, IGNORE: continue other slaves."""
+    ABORT = "abort"
+    IGNORE = "ignore"
+
+
+class TeeSlave(object):
+    """
+    Output of tee muxer. Packets of encoded streams are copied to every slave, nothing is encoded again.
+
+    Parameters
+    ----------
+    path: str
+        Output URI.
+
+    muxer: Muxer | None
+        Format and muxer options of slave. Ex: MP4 with movflags, Segment. None=guess from path.
+
+    onfail: str | None
+        TeeOnFail. None=ABORT
+
+    select: str | None
+        Stream specifier of streams, which are written to slave. None=all.
+
+    bsfs: str | None
+        Bitstream filters of slave. Ex: "v=h264_mp4toannexb"
+    """
+
+    def __init__(self, path, muxer=None, onfail=None, select=None, bsfs=None):
+        if muxer is not None and not isinstance(muxer, Muxer):
+            raise TypeError("muxer must be Muxer.")
+
+        if onfail is not None and onfail not in TeeOnFail:
+            raise ValueError(f"onfail must be in {list(TeeOnFail)}.")
+
+        self.path = path
+        self.muxer = muxer
+        self.onfail = onfail
+        self.select = select
+        self.bsfs = bsfs
+
+    def __repr__(self):
+        return self.build()
+
+    def options(self):
+        """Slave options (name=value): format and options of muxer, then tee options."""
+        options = {}
+        if self.muxer is not None:
+            for name, value in self.muxer.build().items():
+                if value is None or not str(value):
+                    continue
+                options[name] = value
+
+        for name in ("onfail", "select", "bsfs"):
+            value = getattr(self, name)
+            if value is not None:
+                options[name] = value
+        return options
+
+    def build(self):
+        """`[name=value:...]path`, option values are escaped."""
+        options = []
+        for name, value in self.options().items():
+            if "]" in str(value):
+                raise ValueError(f"Option `{name}` of tee slave mustn't contain `]`.")
+            options.append(f"{name}={_escape(value, OPTION_SPECIAL)}")
+
+        if not options:
+            return self.path
+        return f"[{':'.join(options)}]{self.path}"
+
+
+class Tee(Muxer):
+    """
+    Tee muxer: write encoded streams to many outputs. Streams are encoded once whatever number of outputs.
+    Output path is `path()`, streams must be mapped explicitly (`OutputStream.map`).
+    See: https://ffmpeg.org/ffmpeg-formats.html#tee-1
+
+    Parameters
+    ----------
+    slaves: TeeSlave | str
+        Outputs. str=path, format is guessed.
+    """
+
+    def __init__(self, *slaves):
+        super().__init__()
+        self.slaves = []
+        for slave in slaves:
+            self.add(slave)
+
+    def add(self, slave):
+        if isinstance(slave, str):
+            slave = TeeSlave(slave)
+
+        if not isinstance(slave, TeeSlave):
+            raise TypeError("slave must be TeeSlave or str.")
+        self.slaves.append(slave)
+        return slave
+
+    def path(self):
+        """Output path of tee: slaves separated by `|`."""
+        if not self.slaves:
+            raise ValueError("Tee has no slave.")
+        return SLAVE_SEPARATOR.join(_escape(slave.build(), SLAVE_SPECIAL) for slave in self.slaves)
+
+    format = option(
+        Muxer.format,
+        in_list_filter([FormatMuxer.TEE]),
+        FormatMuxer.TEE,
+        doc="Tee muxer"
+    )
+    use_fifo = option("use_fifo", in_list_filter((1, 0)), doc="Write every slave by separate thread (fifo muxer).")
+    fifo_options = option("fifo_options", type_filter(str), doc="Options of fifo muxer of slaves.")
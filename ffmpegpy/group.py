@@ -0,0 +1,440 @@
+import codecs
+import os
+import selectors
+import time
+from collections import deque
+
+from .util.lazy import lazy_import
+from ._ffmpeg import RE_LOG_LINE_END
+from .capture import Frame, VideoCapture
+
+__all__ = ["CaptureGroup", "Batch", "SourceHealth"]
+
+numpy = lazy_import("numpy")
+
+BATCH_WINDOW = 0.05
+STALL_TIMEOUT = 5.
+
+
+class SourceHealth(object):
+    """
+    Health of a source of CaptureGroup.
+
+    Attributes
+    ----------
+    frames: int
+        Frames received.
+
+    dropped: int
+        Frames overwritten by newer frame of the same source before they are emitted in a batch.
+
+    last_frame: float | None
+        `time.monotonic()` when last frame is received.
+
+    ended: bool
+        Output of process ended.
+
+    returncode: int | None
+        Exit code of process. None while process is running.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.monotonic()
+        self.frames = 0
+        self.bytes = 0
+        self.dropped = 0
+        self.last_frame = None
+        self.ended = False
+        self.returncode = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.as_dict()})"
+
+    @property
+    def age(self):
+        """Seconds since last frame (or since start if no frame)."""
+        return time.monotonic() - (self.last_frame or self.started)
+
+    @property
+    def fps(self):
+        """Average received frames per second."""
+        return self.frames / max(time.monotonic() - self.started, 1e-6)
+
+    @property
+    def is_alive(self):
+        return not self.ended and self.returncode is None
+
+    def is_stalled(self, timeout=STALL_TIMEOUT):
+        return self.is_alive and self.age > timeout
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "dropped": self.dropped,
+            "fps": self.fps,
+            "age": self.age,
+            "ended": self.ended,
+            "returncode": self.returncode,
+        }
+
+
+class Batch(dict):
+    """
+    Frames of sources, which arrive in the same window. {name: Frame}
+
+    Attributes
+    ----------
+    timestamp: float
+        Aligned time (`time.monotonic()` clock) of first frame of batch. Arrival time, or capture time estimated
+        from pts if group aligns by timestamps.
+
+    opened: float
+        `time.monotonic()` when first frame of batch is received.
+
+    arrivals: dict
+        {name: `time.monotonic()` when frame is received}
+
+    timestamps: dict
+        {name: pts (seconds) of frame}. Only if group aligns by timestamps, pts may be None.
+
+    missing: list
+        Running sources, which have no frame in batch.
+    """
+
+    def __init__(self, timestamp, opened=None):
+        super().__init__()
+        self.timestamp = timestamp
+        self.opened = timestamp if opened is None else opened
+        self.arrivals = {}
+        self.timestamps = {}
+        self.missing = []
+
+
+class _Source(object):
+    def __init__(self, name, capture, reader, pool):
+        self.name = name
+        self.capture = capture
+        self.reader = reader
+        self.pool = pool
+        self.health = SourceHealth(name)
+        self.frame_size = capture.frame_size
+        self.buffer = None
+        self.view = None
+        self.filled = 0
+        self.new_buffer()
+
+        # stderr is read by group, lines are fed to log reader of process.
+        self.log = reader.log_reader.stream
+        self.log_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.log_partial = ""
+        # FrameTimestamps of process if frames are aligned by timestamps.
+        self.timestamps = getattr(reader, "timestamps", None)
+        # (frame, received) waiting for pts
+        self.pending = deque()
+        # (pts, received) of first frame with pts, origin of capture time.
+        self.origin = None
+
+    def ready(self):
+        """Pop (frame, received, pts) of frames, whose pts is known."""
+        while self.pending:
+            if self.timestamps is None:
+                pts = None
+            elif len(self.timestamps):
+                pts = self.timestamps.get()
+            elif self.log is None:
+                # stderr ended, pts won't come.
+                pts = None
+            else:
+                return
+            frame, received = self.pending.popleft()
+            yield frame, received, pts
+
+    def capture_time(self, received, pts):
+        """Capture time of frame on monotonic clock, estimated from pts relative to first frame."""
+        if pts is None:
+            return received
+        if self.origin is None:
+            self.origin = pts, received
+        return self.origin[1] + pts - self.origin[0]
+
+    def new_buffer(self):
+        width, height = self.frame_size
+        if self.pool is None:
+            self.buffer = numpy.empty(width * height * 3, dtype=numpy.uint8)
+        else:
+            self.buffer = self.pool.acquire((width * height * 3,), numpy.uint8)
+        self.view = memoryview(self.buffer)
+        self.filled = 0
+
+
+class CaptureGroup(object):
+    """
+    Capture many sources in one thread. Pipes of all processes are multiplexed by `selectors` (epoll on Linux)
+    with non-blocking reads, no reader thread per source.
+
+    stderr of processes is read by the same selector, no LogReader thread per source either.
+
+    Frames are emitted in batches: a batch starts at first frame after previous batch and is closed when every
+    running source has a frame or `window` seconds later.
+
+    Parameters
+    ----------
+    window: float
+        Max seconds between first and last frame of a batch.
+
+    pool: FramePool | None
+        Frames are read into buffers of pool, release frames of batch to recycle them.
+        Dropped frames are released by group.
+
+    timestamps: bool
+        Align frames by pts instead of arrival time. Sources run with `timestamps` (See `VideoCapture.run`),
+        capture time of frame is first arrival of source + pts since first frame, so jitter of decoding and pipes
+        doesn't misalign sources. Frame later than `window` after first frame of batch is kept for next batch.
+
+    Examples:
+        group = CaptureGroup()
+        group.add("cam1", VideoCapture("rtsp://...", target_size=(640, None)))
+        group.add("cam2", VideoCapture("rtsp://...", target_size=(640, None)))
+        for batch in group.batches():
+            detect(list(batch.values()))
+    """
+
+    def __init__(self, window=BATCH_WINDOW, pool=None, timestamps=False):
+        if window < 0:
+            raise ValueError("window must be >= 0.")
+
+        self.window = window
+        self.pool = pool
+        self.timestamps = timestamps
+        self.__sources = {}
+        self.__selector = selectors.DefaultSelector()
+        # (source, frame, received, pts) of frames, which aren't put in a batch yet.
+        self.__queue = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __len__(self):
+        return len(self.__sources)
+
+    def __iter__(self):
+        return self.batches()
+
+    def add(self, name, capture, pipe_size=None):
+        """
+        Start capture and add it to group.
+
+        Parameters
+        ----------
+        name: str
+            Name of source in batches and health.
+
+        capture: VideoCapture
+            Capture, which isn't started.
+        """
+        if not isinstance(capture, VideoCapture):
+            raise TypeError("capture must be VideoCapture.")
+
+        if name in self.__sources:
+            raise ValueError(f"Source `{name}` existed!")
+
+        reader = capture.run(pipe_size=pipe_size, timestamps=self.timestamps, log_thread=False)
+        source = _Source(name, capture, reader, self.pool)
+        self.__sources[name] = source
+        for fd in (reader.fileno(), source.log.fileno()):
+            os.set_blocking(fd, False)
+            self.__selector.register(fd, selectors.EVENT_READ, source)
+        return name
+
+    def remove(self, name):
+        """Stop capture of source and remove it from group."""
+        source = self.__sources.pop(name)
+        self.__unregister(source)
+        self.__close_log(source)
+        if source.pool is not None:
+            # partial frame
+            source.pool.release(source.buffer)
+        for frame, _ in source.pending:
+            frame.release()
+        for entry in [entry for entry in self.__queue if entry[0] is source]:
+            self.__queue.remove(entry)
+            entry[1].release()
+        try:
+            source.capture.release()
+        except RuntimeError:
+            # process was killed or failed, its exit code is in health.
+            pass
+
+    def health(self):
+        """{name: SourceHealth}"""
+        for source in self.__sources.values():
+            if source.health.returncode is None:
+                source.health.returncode = source.reader.returncode
+        return {name: source.health for name, source in self.__sources.items()}
+
+    def batches(self, timeout=None):
+        """
+        Iterate batches until all sources end.
+
+        Parameters
+        ----------
+        timeout: float | None
+            Stop if no frame of any source in `timeout` seconds.
+        """
+        while True:
+            batch = self.read(timeout)
+            if batch is None:
+                return
+            yield batch
+
+    def read(self, timeout=None):
+        """
+        Wait next batch.
+
+        Returns
+        -------
+            Batch, None if all sources end or no frame in `timeout` seconds.
+        """
+        batch, full = self.__collect(None)
+        if full:
+            return self.__close(batch)
+
+        while self.__selector.get_map():
+            if batch is None:
+                wait = timeout
+            else:
+                wait = max(batch.opened + self.window - time.monotonic(), 0)
+
+            events = self.__selector.select(wait)
+            if not events:
+                if batch is None:
+                    return None
+                return self.__close(batch)
+
+            sources = []
+            for key, _ in events:
+                source = key.data
+                if source.log is not None and key.fd == source.log.fileno():
+                    self.__read_log(source)
+                else:
+                    frame = self.__read(source)
+                    if frame is not None:
+                        source.pending.append((frame, source.health.last_frame))
+                if source not in sources:
+                    sources.append(source)
+
+            for source in sources:
+                self.__queue.extend((source, *entry) for entry in source.ready())
+
+            batch, full = self.__collect(batch)
+            if full or (batch is not None and (time.monotonic() >= batch.opened + self.window
+                                               or all(source.name in batch for source in self.__running()))):
+                return self.__close(batch)
+
+        # all sources end
+        batch, _ = self.__collect(batch)
+        return self.__close(batch) if batch else None
+
+    def stop(self):
+        for name in list(self.__sources):
+            self.remove(name)
+        self.__selector.close()
+
+    def __collect(self, batch):
+        """
+        Put queued frames in batch.
+
+        Returns
+        -------
+            (batch, full). full: next frame is beyond window of batch, batch must be closed.
+        """
+        while self.__queue:
+            source, frame, received, pts = self.__queue[0]
+            aligned = source.capture_time(received, pts) if self.timestamps else received
+            if batch is None:
+                batch = Batch(aligned, received)
+            elif self.timestamps and aligned > batch.timestamp + self.window:
+                # frame of next batch
+                return batch, True
+            elif source.name in batch:
+                # newer frame of the same source, previous one is dropped.
+                batch[source.name].release()
+                source.health.dropped += 1
+
+            self.__queue.popleft()
+            batch[source.name] = frame
+            batch.arrivals[source.name] = received
+            if self.timestamps:
+                batch.timestamps[source.name] = pts
+        return batch, False
+
+    def __close(self, batch):
+        batch.missing = [source.name for source in self.__running() if source.name not in batch]
+        return batch
+
+    def __running(self):
+        return [source for source in self.__sources.values() if source.health.is_alive]
+
+    def __read(self, source):
+        """Non-blocking read of source. Return frame if it's complete."""
+        try:
+            size = os.readv(source.reader.fileno(), [source.view[source.filled:]])
+        except BlockingIOError:
+            return None
+
+        if not size:
+            self.__unregister(source)
+            source.health.ended = True
+            source.health.returncode = source.reader.returncode
+            return None
+
+        source.filled += size
+        source.health.bytes += size
+        if source.filled < len(source.buffer):
+            return None
+
+        frame = Frame(source.buffer, source.frame_size, pool=source.pool)
+        source.new_buffer()
+        source.health.frames += 1
+        source.health.last_frame = time.monotonic()
+        return frame
+
+    def __read_log(self, source):
+        """Non-blocking read of stderr, complete lines are fed to log reader of process."""
+        try:
+            data = os.read(source.log.fileno(), 0x10000)
+        except BlockingIOError:
+            return
+
+        log_reader = source.reader.log_reader
+        if not data:
+            log_reader.feed(source.log_partial + source.log_decoder.decode(b"", final=True))
+            self.__close_log(source)
+            return
+
+        *lines, source.log_partial = RE_LOG_LINE_END.split(source.log_partial + source.log_decoder.decode(data))
+        for line in lines:
+            log_reader.feed(line)
+
+    def __close_log(self, source):
+        if source.log is None:
+            return
+
+        try:
+            self.__selector.unregister(source.log.fileno())
+        except (KeyError, ValueError):
+            pass
+        source.log.close()
+        source.log = None
+
+    def __unregister(self, source):
+        try:
+            self.__selector.unregister(source.reader.fileno())
+        except (KeyError, ValueError):
+            pass
@@ -5,24 +5,33 @@ from ffmpegpy.util import check_type, convert_kwargs_to_cmd_line_args
 from ffmpegpy.util.pyopt import Options, option, in_list_filter, is_not_params_filter, \
     min_value_filter, type_filter, InterruptedSetOption
 from ffmpegpy.util.constant import ConstantClass
+from ffmpegpy.util.io import Pipe
 
 from ffmpegpy.codecs.coding import Codec, Encoding, Decoding
+from ffmpegpy.codecs.stream import stream_specifier, specify_options
 from ffmpegpy.formats.format import Muxer, V4L2, Demuxer
 from ffmpegpy.hwaccel import HWAccel, HWAccelType
 
 REGEX_TIME_FMT = re.compile(r"(\d{1,2})[:](\d{1,2})[:](\d{1,2})")
 LINUX_DEVICE = "/dev/video"
+STDIN_PIPE = "pipe:0"
 
 
 __all__ = [
-    'LogLevel', 'VSync',
+    'LogLevel', 'VSync', 'mpdecimate_filter',
     'InputStream', 'OutputStream', 'InputOptionsBase'
 ]
 
 
 class LogLevel(ConstantClass):
+    TRACE = "trace"
+    DEBUG = "debug"
+    VERBOSE = "verbose"
     INFO = "info"
+    WARNING = "warning"
     ERROR = "error"
+    FATAL = "fatal"
+    PANIC = "panic"
     QUIET = "quiet"
 
 
@@ -34,9 +43,66 @@ class VSync(ConstantClass):
     AUTO = 'auto'
 
 
+def mpdecimate_filter(hi=None, lo=None, frac=None, max_drop=None):
+    """
+    `mpdecimate` filter, which drops frames barely different from previous kept frame.
+    Frames are compared by 8x8 blocks, None=default of ffmpeg.
+    See: https://ffmpeg.org/ffmpeg-filters.html#mpdecimate
+
+    Parameters
+    ----------
+    hi: int
+        Frame is kept if any block differs more than `hi`. Default: 64*12
+
+    lo: int
+        Block differs if it differs more than `lo`. Default: 64*5
+
+    frac: float
+        Frame is kept if fraction of different blocks is more than `frac`. Default: 0.33
+
+    max_drop: int
+        > 0: max number of consecutive dropped frames. < 0: min interval between dropped frames. Default: 0=no limit
+    """
+    params = {"hi": hi, "lo": lo, "frac": frac, "max": max_drop}
+    params = ":".join(f"{key}={value}" for key, value in params.items() if value is not None)
+    return f"mpdecimate={params}" if params else "mpdecimate"
+
+
+def to_stream_specifier(stream, input_index=None):
+    """
+    Convert stream to stream specifier.
+
+    Parameters
+    ----------
+    stream: str | int | dict
+        Stream specifier, absolute stream index or stream info of `ProbeInfo.streams`.
+
+    input_index: int | None
+        Index of input file.
+    """
+    if isinstance(stream, dict):
+        stream = stream["index"]
+
+    if isinstance(stream, int):
+        return stream_specifier(index=stream, input_index=input_index)
+
+    if not isinstance(stream, str):
+        raise TypeError(f"Stream must be str, int or dict. Got {type(stream)}")
+
+    if input_index is not None:
+        return f"{input_index}:{stream}"
+    return stream
+
+
 class StreamOptions(Options):
     @staticmethod
     def convert_time(times):
+        if isinstance(times, (int, float)) and not isinstance(times, bool):
+            # seconds, support fractional seconds. Ex: keyframe's timestamps
+            if times < 0:
+                raise ValueError(f"Time must be >= 0. Got {times}")
+            return f"{times:.6f}"
+
         if isinstance(times, str):
             if len(times) > 8:
                 raise ValueError("Time format: %H:%M:%s. Ex: 09:35:12")
@@ -108,9 +174,35 @@ class OutputOptions(StreamOptions):
         else:
             self.video_filter = _filter
 
+    def prepend_video_filter(self, _filter):
+        """Insert filter at start of chain. Ex: drop frames before they are scaled or converted."""
+        check_type(_filter, str)
+
+        if self.is_set(OutputOptions.video_filter):
+            _filter += f",{self.video_filter}"
+        self.video_filter = _filter
+
+    def drop_static(self, hi=None, lo=None, frac=None, max_drop=None):
+        """
+        Drop frames of static scene in ffmpeg (`mpdecimate`), before other filters. Output is VFR, so timestamps
+        of kept frames stay correct and dropped frames aren't duplicated back.
+        Thresholds: see `mpdecimate_filter`. Skipped frames: see `ProgressInfo.skipped_frames`
+        """
+        self.prepend_video_filter(mpdecimate_filter(hi, lo, frac, max_drop))
+        self.variable_frame_rate()
+
+    def variable_frame_rate(self):
+        """Output frames at their own timestamps (VFR), output frame rate would duplicate frames to fill gaps."""
+        if self.is_set(OutputOptions.frame_rate):
+            del self.frame_rate
+        self.video_sync = VSync.VFR
+
     video_filter = option("vf", type_filter(str))
     audio_filter = option("af", type_filter(str))
     frame_rate = option("r", type_filter((float, int)))
+    audio_sample_rate = option("ar", min_value_filter(1), doc="Resample audio to sample rate (Hz).")
+    audio_channels = option("ac", min_value_filter(1), doc="Mix audio to number of channels.")
+    video_frames = option("frames:v", min_value_filter(1), doc="Stop after number of video frames.")
     overwrite = option("y", __convert_overwrite)
 
 
@@ -173,6 +265,22 @@ class Stream(Options):
 
 
 class InputStream(Stream, InputOptions, HWAccel):
+    """
+    Parameters
+    ----------
+    path: str | int | Pipe | bytes | memoryview | file-like | iterable of bytes
+        Source URI, local device (int), extra pipe or in-memory data. In-memory data is fed to stdin (`pipe:0`)
+        by `FFmpeg.run`, see `StdinWriter`. Set `muxer` (format) if it can't be guessed from content.
+
+    Attributes
+    ----------
+    data: object | None
+        In-memory data of input. None=path is URI.
+
+    pipe: Pipe | None
+        Extra pipe of input, Python writes it. See `Pipe`
+    """
+
     def __init__(self, path, codec=None, demuxer=None):
         if codec is None:
             codec = DecodeVideo()
@@ -182,19 +290,48 @@ class InputStream(Stream, InputOptions, HWAccel):
 
         super().__init__(codec, demuxer)
         self.path = path
+        self.discards = []
 
     def build(self):
         cmd = super().build()
+        for specifier in self.discards:
+            cmd += [f"-discard:{specifier}", "all"]
         cmd.append("-i")
         cmd.append(self.path)
         return cmd
 
+    def discard(self, *streams):
+        """
+        Discard streams at demuxer. Discarded streams aren't demuxed or decoded.
+
+        Parameters
+        ----------
+        streams: str | int | dict
+            Stream specifier, absolute stream index or stream info of `ProbeInfo.streams`.
+        """
+        for stream in streams:
+            specifier = to_stream_specifier(stream)
+            if specifier not in self.discards:
+                self.discards.append(specifier)
+
     @property
     def path(self):
+        # path of pipe is built from its descriptor, it fails once pipe is used by a run.
+        if self.pipe is not None:
+            return self.pipe.path
         return self.__path
 
     @path.setter
     def path(self, path):
+        self.data = None
+        self.pipe = None
+        if isinstance(path, Pipe):
+            self.pipe = path
+            path = path.path
+        elif not isinstance(path, (str, int)):
+            self.data = path
+            path = STDIN_PIPE
+
         if isinstance(path, int) and sys.platform == "linux":
             path = f"{LINUX_DEVICE}{path}"
 
@@ -239,6 +376,13 @@ class InputStream(Stream, InputOptions, HWAccel):
 
 
 class OutputStream(Stream, OutputOptions):
+    """
+    Parameters
+    ----------
+    path: str | Pipe | None
+        Output URI or extra pipe, which Python reads. See `Pipe`
+    """
+
     def __init__(self, path=None, codec=None, muxer=None):
         if not codec:
             codec = EncodeVideo()
@@ -248,19 +392,59 @@ class OutputStream(Stream, OutputOptions):
 
         super().__init__(codec, muxer)
         self.path = path
-
-    # self.maps = []
-    # def multi_output(self, outputs):
-    #     for output in outputs:
-    # TODO: support multi IO stream. https://trac.ffmpeg.org/wiki/Creating%20multiple%20outputs
-    # def map(self, stream, output):
-    #     self.maps.append((stream, output))
+        self.maps = []
+        self.stream_codecs = {}
 
     def build(self):
         cmd = super().build()
+        for specifier in self.maps:
+            cmd += ["-map", specifier]
+
+        for specifier, codec in self.stream_codecs.items():
+            cmd += convert_kwargs_to_cmd_line_args(specify_options(codec.build(), specifier))
         cmd.append(self.path)
         return cmd
 
+    @property
+    def path(self):
+        # path of pipe is built from its descriptor, it fails once pipe is used by a run.
+        if self.pipe is not None:
+            return self.pipe.path
+        return self.__path
+
+    @path.setter
+    def path(self, path):
+        self.pipe = None
+        if isinstance(path, Pipe):
+            self.pipe = path
+            path = path.path
+        self.__path = path
+
+    def map(self, *streams, input_index=0):
+        """
+        Select input streams for this output. Unless any stream is mapped, ffmpeg select streams automatically.
+
+        Parameters
+        ----------
+        streams: str | int | dict
+            Stream specifier (without input index), absolute stream index or stream info of `ProbeInfo.streams`.
+
+        input_index: int
+            Index of input file.
+        """
+        for stream in streams:
+            specifier = to_stream_specifier(stream, input_index)
+            if specifier not in self.maps:
+                self.maps.append(specifier)
+
+    def set_stream_codec(self, specifier, codec):
+        """
+        Set codec options for output streams matched by `specifier`. Ex: "a:0", "v:1"
+        """
+        if not isinstance(codec, Encoding):
+            raise TypeError(f"Must be Encoding.")
+        self.stream_codecs[to_stream_specifier(specifier)] = codec
+
     @staticmethod
     def filter_encoder(encoder):
         if not isinstance(encoder, (EncodeVideo, str)):
@@ -0,0 +1,152 @@
+import io
+import re
+import threading
+import time
+import traceback
+from collections import deque
+
+__all__ = ["LogReader", "LOG_LEVELS", "LOG_LINES_DEFAULT", "classify", "is_severe"]
+
+LOG_LINES_DEFAULT = 200
+
+# severity order, most severe first. See: -loglevel of https://ffmpeg.org/ffmpeg.html
+LOG_LEVELS = ("panic", "fatal", "error", "warning", "info", "verbose", "debug", "trace")
+LEVEL_UNKNOWN = "info"
+
+# `-loglevel level+...` prefix every line with its level. Ex: "[h264 @ 0x55d0] [error] no frame!"
+RE_LEVEL = re.compile(r"\[(panic|fatal|error|warning|info|verbose|debug|trace)\] ")
+RE_STATS = re.compile(r"^(frame=\s*\d+|size=\s*\S+)\s.*time=")
+
+
+def classify(line):
+    """
+    Split ffmpeg log line to (level, message).
+    Level of line without prefix (`-loglevel` hasn't `level` flag) is "info".
+    """
+    matched = RE_LEVEL.search(line)
+    if matched is None:
+        return LEVEL_UNKNOWN, line
+    return matched.group(1), line[:matched.start()] + line[matched.end():]
+
+
+def is_severe(level, min_level):
+    """Level is at least as severe as `min_level`."""
+    return LOG_LEVELS.index(level) <= LOG_LEVELS.index(min_level)
+
+
+class LogReader(threading.Thread):
+    """
+    Drain stderr of ffmpeg process in background, keep last lines in ring buffer.
+
+    Process never blocks on full stderr pipe whatever log level and memory is bounded.
+
+    Parameters
+    ----------
+    stream: BinaryIO | None
+        stderr of process. Closed when process exit. Lines are fed by `feed` instead if thread isn't started.
+
+    max_lines: int
+        Size of ring buffer.
+
+    listeners: list of callable
+        Listen every line from first line. See `add_listener`
+
+    Attributes
+    ----------
+    stats: str | None
+        Last stats line (frame=... fps=... time=...). Stats lines aren't kept in ring buffer.
+
+    counts: dict
+        Number of lines by level, include lines dropped from ring buffer.
+    """
+
+    def __init__(self, stream, max_lines=LOG_LINES_DEFAULT, listeners=()):
+        super().__init__(name=f"{self.__class__.__name__}-{id(stream):x}", daemon=True)
+        if max_lines <= 0:
+            raise ValueError("max_lines must be > 0.")
+
+        self.stream = stream
+        self.stats = None
+        self.counts = dict.fromkeys(LOG_LEVELS, 0)
+        self.__lines = deque(maxlen=max_lines)
+        self.__listeners = list(listeners)
+        self.__lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.lines())
+
+    def add_listener(self, listener):
+        """
+        Listen every classified line, called in reader thread with (level, message).
+        Listener must be fast, reader doesn't drain stderr while listener is running.
+
+        Line is consumed (not kept in ring buffer) if listener returns True. Ex: per-frame lines of
+        `showinfo` filter, which would evict other lines.
+        """
+        if not callable(listener):
+            raise TypeError("listener must be callable.")
+
+        with self.__lock:
+            self.__listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self.__lock:
+            self.__listeners.remove(listener)
+
+    def lines(self, min_level=None):
+        """
+        Lines in ring buffer, oldest first.
+
+        Parameters
+        ----------
+        min_level: str | None
+            Only lines at least as severe as min_level. Ex: "warning" -> panic, fatal, error, warning.
+
+        Returns
+        -------
+            List of (timestamp, level, message)
+        """
+        with self.__lock:
+            lines = list(self.__lines)
+
+        if min_level is None:
+            return lines
+        return [line for line in lines if is_severe(line[1], min_level)]
+
+    def errors(self):
+        return self.lines("error")
+
+    def tail(self, num_lines=10):
+        return self.lines()[-num_lines:]
+
+    def run(self):
+        # universal newlines: stats are terminated by `\r`
+        with io.TextIOWrapper(self.stream, errors="replace") as text:
+            for line in text:
+                self.feed(line)
+
+    def feed(self, line):
+        """Classify and keep a line. Called by reader thread, or directly if stderr is read elsewhere."""
+        line = line.rstrip()
+        if not line:
+            return
+
+        level, message = classify(line)
+        if RE_STATS.match(message):
+            self.stats = message
+            return
+
+        with self.__lock:
+            self.counts[level] += 1
+            listeners = list(self.__listeners)
+
+        consumed = False
+        for listener in listeners:
+            try:
+                consumed |= bool(listener(level, message))
+            except Exception:
+                traceback.print_exc()
+
+        if not consumed:
+            with self.__lock:
+                self.__lines.append((time.time(), level, message))
@@ -0,0 +1,270 @@
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+from ._ffmpeg import FFmpeg, InputStream, OutputStream, LogLevel
+from .codecs.coding import Encoding
+from .codecs.copy import CopyCoding
+from .ffprobe import FFprobe
+from .formats.concat import ConcatDemuxer, write_concat_list
+from .formats.format import Muxer, FormatMuxer
+from .util.io import Subprocess
+
+__all__ = ["ParallelTranscoder", "plan_segments"]
+
+MIN_SEGMENT_DURATION = 10
+SEGMENT_NAME = "segment_{index:05}.ts"
+CONCAT_LIST_NAME = "segments.ffconcat"
+
+
+def plan_segments(keyframes, duration, segments, min_duration=MIN_SEGMENT_DURATION):
+    """
+    Split input at keyframes into about `segments` segments of equal duration.
+
+    Parameters
+    ----------
+    keyframes: list of float
+        Sorted keyframe timestamps. See `FFprobe.keyframes`
+
+    duration: float
+        Duration of input (seconds)
+
+    segments: int
+        Expected number of segments.
+
+    min_duration: float
+        Minimum duration of a segment (seconds).
+
+    Returns
+    -------
+        List of (start, end) timestamps. Each segment starts at keyframe, end=None: until end of input.
+    """
+    if segments < 1:
+        raise ValueError("Number of segments must be >= 1.")
+
+    if not keyframes:
+        raise ValueError("Keyframes empty!")
+
+    starts = [keyframes[0]]
+    for idx in range(1, segments):
+        position = bisect_left(keyframes, keyframes[0] + duration * idx / segments)
+        if position >= len(keyframes):
+            break
+
+        keyframe = keyframes[position]
+        if keyframe - starts[-1] < min_duration:
+            continue
+        starts.append(keyframe)
+
+    ends = starts[1:] + [None]
+    return list(zip(starts, ends))
+
+
+class ParallelTranscoder(object):
+    """
+    Keyframe-aligned segment-parallel transcoder.
+
+    Input is split at keyframes, each segment's video is encoded by separate ffmpeg process with identical
+    encoding settings. Encoded segments are joined by concat demuxer with stream copy, audio is copied from
+    source.
+
+    Parameters
+    ----------
+    src: str
+        Source file. Require seekable input.
+
+    encoding: Encoding
+        Video encoding settings of all segments.
+
+    workers: int | None
+        Number of concurrent encoders. Default: number of CPUs.
+
+    min_duration: float
+        Minimum duration of a segment (seconds).
+
+    Attributes
+    ----------
+    probe: FFprobe
+        Probe of source.
+
+    segments: list of (float, float | None)
+        Segments of last run. See `plan_segments`
+    """
+
+    def __init__(self, src, encoding, workers=None, min_duration=MIN_SEGMENT_DURATION):
+        if not isinstance(encoding, Encoding):
+            raise TypeError("encoding must be Encoding.")
+
+        self.src = src
+        self.encoding = encoding
+        self.workers = workers or os.cpu_count() or 1
+        self.min_duration = min_duration
+        self.probe = FFprobe(src)
+        self.segments = []
+
+        self.__processes = []
+        self.__lock = threading.Lock()
+
+    @property
+    def start_time(self):
+        """Start time of input. `-ss` of input is relative to this time."""
+        start_times = [float(stream['start_time']) for stream in self.probe.info.streams
+                       if stream.get('start_time', 'N/A') != 'N/A']
+        return min(start_times, default=0.)
+
+    def plan(self):
+        info = self.probe.info
+        return plan_segments(self.probe.keyframes(), info.duration, self.workers, self.min_duration)
+
+    def run(self, output, muxer=None, verify=True, work_dir=None):
+        """
+        Transcode source to output.
+
+        Parameters
+        ----------
+        output: str
+            Output path.
+
+        muxer: Muxer | None
+            Output muxer. None=guess from output's extension.
+
+        verify: bool
+            Check continuity of timestamps and frame count. See `verify`
+
+        work_dir: str | None
+            Directory of encoded segments. Default: temporary directory, which is removed after run.
+        """
+        if work_dir is not None:
+            return self.__run(output, muxer, verify, work_dir)
+
+        with tempfile.TemporaryDirectory(prefix="ffmpegpy-") as work_dir:
+            return self.__run(output, muxer, verify, work_dir)
+
+    def __run(self, output, muxer, verify, work_dir):
+        self.segments = self.plan()
+        paths = [os.path.join(work_dir, SEGMENT_NAME.format(index=index)) for index in range(len(self.segments))]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self.__encode_segment, start, end, path)
+                for (start, end), path in zip(self.segments, paths)
+            ]
+
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                self.kill()
+                raise
+
+        list_path = os.path.join(work_dir, CONCAT_LIST_NAME)
+        write_concat_list(list_path, paths)
+        self.__wait(self.concat_command(list_path, output, muxer), "Concat segments")
+
+        if verify:
+            self.verify(output)
+        return output
+
+    def segment_command(self, start, end, path):
+        """Build encoding command of segment [start, end)."""
+        info = self.probe.info
+        input_stream = InputStream(self.src)
+
+        if start > self.segments[0][0]:
+            # input seeking, ffmpeg jump to keyframe before decoding
+            input_stream.seek = start - self.start_time
+
+        if end is not None:
+            # stop half frame before next keyframe to avoid duplicated frame at boundary.
+            input_stream.duration = end - start - 0.5 / info.r_frame_rate
+
+        muxer = Muxer()
+        muxer.format = FormatMuxer.MPEGTS
+        output_stream = OutputStream(path, codec=deepcopy(self.encoding), muxer=muxer)
+        output_stream.map("v:0")
+        output_stream.overwrite = None
+        return self.__command(input_stream, output_stream)
+
+    def concat_command(self, list_path, output, muxer=None):
+        """Build command, which join encoded segments (stream copy) and copy audio of source."""
+        demuxer = ConcatDemuxer()
+        demuxer.safe = 0
+
+        output_stream = OutputStream(output, codec=CopyCoding(), muxer=muxer)
+        output_stream.overwrite = None
+        mpeg = self.__command(InputStream(list_path, demuxer=demuxer), output_stream)
+
+        audio_input = InputStream(self.src)
+        audio_input.discard("v")
+        audio_index = mpeg.add_input(audio_input)
+
+        output_stream.map("v:0", input_index=0)
+        output_stream.map("a?", input_index=audio_index)
+        return mpeg
+
+    def verify(self, output):
+        """
+        Check output is continuous: same number of video frames as source and no timestamp gap
+        larger than largest gap of source.
+
+        Raises
+        ------
+        RuntimeError:
+            Output isn't continuous.
+        """
+        source_pts = [pts for pts, _ in self.probe.packets()]
+        output_pts = [pts for pts, _ in FFprobe(output).packets()]
+
+        if len(source_pts) != len(output_pts):
+            raise RuntimeError(f"Frame count mismatch. Source: {len(source_pts)} frames, "
+                               f"output: {len(output_pts)} frames.")
+
+        def max_gap(timestamps):
+            return max((b - a for a, b in zip(timestamps, timestamps[1:])), default=0.)
+
+        def min_gap(timestamps):
+            return min((b - a for a, b in zip(timestamps, timestamps[1:])), default=1.)
+
+        # tolerance: timestamp rounding of containers (mpegts: 90kHz, mp4: timescale)
+        tolerance = 0.5 / self.probe.info.r_frame_rate
+        if max_gap(output_pts) > max_gap(source_pts) + tolerance:
+            raise RuntimeError(f"Timestamp gap in output: {max_gap(output_pts):.6f}s. "
+                               f"Source: {max_gap(source_pts):.6f}s.")
+
+        if min_gap(output_pts) <= 0:
+            raise RuntimeError("Duplicated timestamps in output.")
+
+    def kill(self):
+        with self.__lock:
+            for process in self.__processes:
+                if process.is_alive():
+                    process.kill()
+
+    @staticmethod
+    def __command(input_stream, output_stream):
+        mpeg = FFmpeg(input_stream, output_stream)
+        mpeg.nostdin = None
+        mpeg.loglevel = LogLevel.ERROR
+        return mpeg
+
+    def __encode_segment(self, start, end, path):
+        return self.__wait(self.segment_command(start, end, path), f"Encode segment [{start}, {end})")
+
+    def __wait(self, mpeg, task):
+        process = mpeg.run(stdin=Subprocess.DEVNULL)
+        with self.__lock:
+            self.__processes.append(process)
+
+        try:
+            process.wait()
+        finally:
+            with self.__lock:
+                self.__processes.remove(process)
+
+        if process.returncode != 0:
+            raise process.error(f"{task} failed - code {process.returncode}")
@@ -0,0 +1,145 @@
+import threading
+import traceback
+import warnings
+import weakref
+from collections import defaultdict
+
+from .util.lazy import lazy_import
+
+__all__ = ["FramePool"]
+
+numpy = lazy_import("numpy")
+
+MAX_FREE_DEFAULT = 8
+
+
+class FramePool(object):
+    """
+    Pool of frame buffers, keyed by (shape, dtype). Buffers are borrowed by `acquire` and returned by `release`,
+    steady-state capture doesn't allocate any buffer per frame.
+
+    Parameters
+    ----------
+    max_free: int
+        High-water limit: free buffers kept per key. Released buffers over limit are left to GC.
+
+    debug: bool
+        Track stack of every borrowed buffer. Buffer, which is garbage collected without release, is reported
+        by ResourceWarning. See `leaks`
+
+    Examples:
+        pool = FramePool()
+        capture = VideoCapture(src, pool=pool)
+        frame = capture.read()
+        ...
+        frame.release()
+    """
+
+    def __init__(self, max_free=MAX_FREE_DEFAULT, debug=False):
+        if max_free < 0:
+            raise ValueError("max_free must be >= 0.")
+
+        self.max_free = max_free
+        self.debug = debug
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.outstanding = 0
+
+        self.__free = defaultdict(list)
+        # ids of borrowed buffers, a buffer is released once.
+        self.__lent = set()
+        self.__borrowed = {}
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.stats()})"
+
+    @staticmethod
+    def key(shape, dtype):
+        return tuple(shape), numpy.dtype(dtype).str
+
+    def acquire(self, shape, dtype="uint8"):
+        """Borrow buffer. Content is undefined."""
+        key = self.key(shape, dtype)
+        with self.__lock:
+            free = self.__free[key]
+            buffer = free.pop() if free else None
+            if buffer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.outstanding += 1
+
+        if buffer is None:
+            buffer = numpy.empty(shape, dtype=dtype)
+
+        with self.__lock:
+            self.__lent.add(id(buffer))
+
+        if self.debug:
+            self.__track(buffer)
+        return buffer
+
+    def release(self, buffer):
+        """
+        Return borrowed buffer. Buffer mustn't be used after release.
+
+        Raises
+        ------
+        ValueError:
+            Buffer isn't borrowed from pool or it's already released.
+        """
+        key = self.key(buffer.shape, buffer.dtype)
+        with self.__lock:
+            if id(buffer) not in self.__lent:
+                raise ValueError("Buffer isn't borrowed from pool or it's already released.")
+            self.__lent.remove(id(buffer))
+
+            tracked = self.__borrowed.pop(id(buffer), None)
+            if tracked is not None:
+                tracked[0].detach()
+
+            self.outstanding -= 1
+            free = self.__free[key]
+            if len(free) < self.max_free:
+                free.append(buffer)
+            else:
+                self.evicted += 1
+
+    def clear(self):
+        """Drop all free buffers."""
+        with self.__lock:
+            self.__free.clear()
+
+    def stats(self):
+        with self.__lock:
+            free = [buffer for buffers in self.__free.values() for buffer in buffers]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+                "outstanding": self.outstanding,
+                "free": len(free),
+                "free_bytes": sum(buffer.nbytes for buffer in free),
+            }
+
+    def leaks(self):
+        """Debug mode: stacks of buffers, which are borrowed and not released yet."""
+        with self.__lock:
+            return [stack for _, stack in self.__borrowed.values()]
+
+    def __track(self, buffer):
+        stack = "".join(traceback.format_stack(limit=8)[:-2])
+        finalizer = weakref.finalize(buffer, self.__leaked, id(buffer), stack)
+        with self.__lock:
+            self.__borrowed[id(buffer)] = (finalizer, stack)
+
+    def __leaked(self, buffer_id, stack):
+        with self.__lock:
+            self.__borrowed.pop(buffer_id, None)
+            self.__lent.discard(buffer_id)
+            self.outstanding -= 1
+        warnings.warn(f"Frame buffer is garbage collected without release. Borrowed at:\n{stack}",
+                      ResourceWarning)
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+import traceback
+
+from .util.pyopt import Options, option
+
+__all__ = ["ProgressInfo", "ProgressReader"]
+
+PROGRESS_END = "end"
+NOT_AVAILABLE = "N/A"
+
+
+def _to_bitrate(_value):
+    # "1234.5kbits/s" -> kbit/s
+    return float(_value.strip().replace("kbits/s", ""))
+
+
+def _to_speed(_value):
+    # "1.02x" -> 1.02
+    return float(_value.strip().rstrip("x"))
+
+
+class ProgressInfo(Options):
+    """
+    Progress snapshot of running ffmpeg, reported by `-progress`.
+
+    Attributes
+    ----------
+    timestamp: float
+        `time.monotonic()` when snapshot is received.
+    """
+
+    def __init__(self, report=None):
+        super().__init__()
+        self.timestamp = time.monotonic()
+
+        attrs = {opt.name: attr for attr, opt in self.options()}
+        for key, value in (report or {}).items():
+            if value == NOT_AVAILABLE or key not in attrs:
+                continue
+            setattr(self, attrs[key], value)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self})"
+
+    @property
+    def out_seconds(self):
+        """Output timestamp (seconds). None if it isn't reported yet (`N/A` in first reports)."""
+        if not self.is_set(ProgressInfo.out_time_us):
+            return None
+        return self.out_time_us / 1e6
+
+    @property
+    def is_end(self):
+        return self.progress == PROGRESS_END
+
+    def skipped_frames(self, frame_rate):
+        """
+        Estimated frames, which are dropped by filters (Ex: `mpdecimate`) of VFR output:
+        frames of source at `frame_rate` up to output timestamp - output frames.
+        None if output timestamp or frames aren't reported yet.
+        """
+        if not (self.is_set(ProgressInfo.out_time_us) and self.is_set(ProgressInfo.frame)):
+            return None
+        return max(0, int(round(self.out_seconds * frame_rate)) - self.frame)
+
+    def is_realtime(self, threshold=1.):
+        """Processing speed at least `threshold` times realtime. None if speed isn't reported yet."""
+        if not self.is_set(ProgressInfo.speed):
+            return None
+        return self.speed >= threshold
+
+    frame = option("frame", lambda _value: int(_value), doc="Number of output frames.")
+    fps = option("fps", lambda _value: float(_value), doc="Encoding frames per second.")
+    bitrate = option("bitrate", _to_bitrate, doc="Output bitrate (kbit/s)")
+    total_size = option("total_size", lambda _value: int(_value), doc="Output size (bytes)")
+    out_time_us = option("out_time_us", lambda _value: int(_value), doc="Output timestamp (microseconds)")
+    out_time = option("out_time", doc="Output timestamp (HH:MM:SS.MICROSECONDS)")
+    dup_frames = option("dup_frames", lambda _value: int(_value), doc="Duplicated frames.")
+    drop_frames = option("drop_frames", lambda _value: int(_value), doc="Dropped frames.")
+    speed = option("speed", _to_speed, doc="Processing speed (multiple of realtime)")
+    progress = option("progress", doc="`continue` or `end`")
+
+
+class ProgressReader(threading.Thread):
+    """
+    Read `-progress pipe:N` reports of ffmpeg process and publish ProgressInfo snapshots.
+
+    Parameters
+    ----------
+    fd: int
+        Read end of progress pipe. Closed when ffmpeg process exit.
+
+    callbacks: list of callable
+        Call with ProgressInfo whenever a report is complete.
+
+    Attributes
+    ----------
+    progress: ProgressInfo | None
+        Latest snapshot. None unless any report.
+    """
+
+    def __init__(self, fd, callbacks=()):
+        super().__init__(name=f"{self.__class__.__name__}-{fd}", daemon=True)
+        self.fd = fd
+        self.progress = None
+        self.__callbacks = list(callbacks)
+        self.__lock = threading.Lock()
+
+    def add_callback(self, callback):
+        if not callable(callback):
+            raise TypeError("callback must be callable.")
+
+        with self.__lock:
+            self.__callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        with self.__lock:
+            self.__callbacks.remove(callback)
+
+    def run(self):
+        report = {}
+        with os.fdopen(self.fd, "r", errors="replace") as f:
+            for line in f:
+                key, _, value = line.strip().partition("=")
+                if not key:
+                    continue
+
+                report[key] = value
+                if key != "progress":
+                    continue
+
+                self.progress = ProgressInfo(report)
+                report = {}
+                self.__publish(self.progress)
+
+    def __publish(self, progress):
+        with self.__lock:
+            callbacks = list(self.__callbacks)
+
+        for callback in callbacks:
+            try:
+                callback(progress)
+            except Exception:
+                # never stop reading, ffmpeg will block on full progress pipe.
+                traceback.print_exc()
@@ -0,0 +1,239 @@
+import csv
+import math
+import os
+import threading
+import traceback
+from collections import deque
+
+from ._ffmpeg import LogLevel
+from .capture import Capture, ProcessHandler
+from .formats.segment import Segment, SegmentListType
+from .util.io import Pipe
+
+__all__ = ["SegmentWriter", "SegmentInfo"]
+
+SEGMENT_TIME = 6
+HLS_VERSION = 3
+
+
+class SegmentInfo(object):
+    """
+    Complete segment.
+
+    Attributes
+    ----------
+    sequence: int
+        Number of segment, from 0.
+
+    path: str
+        Path of segment file.
+
+    start: float
+        Presentation timestamp (seconds) of start of segment.
+
+    duration: float
+        Seconds.
+
+    bytes: int
+        Size of segment file. None if file isn't found (Ex: it's removed already).
+    """
+
+    def __init__(self, sequence, path, start, end):
+        self.sequence = sequence
+        self.path = path
+        self.start = start
+        self.duration = end - start
+        try:
+            self.bytes = os.path.getsize(path)
+        except OSError:
+            self.bytes = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.as_dict()})"
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+    def as_dict(self):
+        return {
+            "sequence": self.sequence,
+            "path": self.path,
+            "start": self.start,
+            "duration": self.duration,
+            "bytes": self.bytes,
+        }
+
+
+class SegmentWriter(Capture):
+    """
+    Write source to segment files and report every segment as soon as it's complete.
+
+    ffmpeg writes segment list (csv) to a pipe (`-segment_list pipe:N`), a line per complete segment.
+    The list is parsed by a thread, directory of segments is never polled.
+
+    Parameters
+    ----------
+    pattern: str
+        Path of segments. Ex: "/data/cam1/%05d.ts"
+
+    segment_time: float
+        Target duration of segments (seconds). Segments are cut at keyframes.
+
+    segment_format: str | None
+        Format of segments. Ex: FormatMuxer.MPEGTS for HLS. None=guess from pattern.
+
+    codec: Encoding | None
+        Output codec. Ex: CopyCoding() to segment without encoding.
+
+    callbacks: list of callable
+        Call with SegmentInfo when segment is complete.
+
+    max_segments: int | None
+        Keep index of last `max_segments` segments (live playlist window). None=all.
+
+    Examples:
+        writer = SegmentWriter("rtsp://...", "/data/cam1/%05d.ts", codec=CopyCoding(),
+                               segment_format=FormatMuxer.MPEGTS, callbacks=[upload], max_segments=10)
+        writer.start()
+        ...
+        writer.write_playlist("/data/cam1/live.m3u8")
+    """
+
+    def __init__(self, src, pattern, segment_time=SEGMENT_TIME, segment_format=None, codec=None, demuxer=None,
+                 callbacks=(), max_segments=None):
+        super().__init__(src, pattern, demuxer)
+        self.pattern = pattern
+
+        output_stream = self.mpeg.output_stream
+        if codec is not None:
+            output_stream.codec = codec
+
+        muxer = Segment()
+        muxer.segment_time = segment_time
+        if segment_format is not None:
+            muxer.segment_format = segment_format
+        output_stream.muxer = muxer
+        self.mpeg.loglevel = LogLevel.ERROR
+
+        self.segments = deque(maxlen=max_segments)
+        self.ended = False
+        self.__sequence = 0
+        self.__callbacks = list(callbacks)
+        self.__lock = threading.Lock()
+        self.__thread = None
+
+    def add_callback(self, callback):
+        if not callable(callback):
+            raise TypeError("callback must be callable.")
+
+        with self.__lock:
+            self.__callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        with self.__lock:
+            self.__callbacks.remove(callback)
+
+    def index(self):
+        """Complete segments in index, oldest first: list of SegmentInfo."""
+        with self.__lock:
+            return list(self.segments)
+
+    def start(self, progress=None):
+        pipe = Pipe("r")
+        muxer = self.mpeg.output_stream.muxer
+        muxer.segment_list = pipe.path
+        muxer.segment_list_type = SegmentListType.CSV
+        self.ended = False
+
+        try:
+            self.process = ProcessHandler(self.mpeg.run(progress=progress, pass_fds=(pipe.child_fd,)))
+        except BaseException:
+            pipe.close()
+            raise
+        finally:
+            pipe.close_child()
+
+        read_fd = pipe.detach()
+        self.__thread = threading.Thread(target=self.__read_list, args=(read_fd,),
+                                         name=f"{self.__class__.__name__}-{read_fd}", daemon=True)
+        self.__thread.start()
+        return self.process
+
+    def release(self):
+        super().release()
+        self.__join()
+
+    def kill(self):
+        super().kill()
+        self.__join()
+
+    def playlist(self, base_url="", end=None):
+        """
+        HLS media playlist of segments in index.
+
+        Parameters
+        ----------
+        base_url: str
+            Prefix of segment URIs. URI: base_url + file name of segment.
+
+        end: bool | None
+            Add `#EXT-X-ENDLIST`. None=when process ended.
+        """
+        segments = self.index()
+        target_duration = max((segment.duration for segment in segments), default=0)
+        lines = [
+            "#EXTM3U",
+            f"#EXT-X-VERSION:{HLS_VERSION}",
+            f"#EXT-X-TARGETDURATION:{max(1, math.ceil(target_duration))}",
+            f"#EXT-X-MEDIA-SEQUENCE:{segments[0].sequence if segments else 0}",
+        ]
+        for segment in segments:
+            lines.append(f"#EXTINF:{segment.duration:.6f},")
+            lines.append(f"{base_url}{os.path.basename(segment.path)}")
+
+        if self.ended if end is None else end:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def write_playlist(self, path, base_url="", end=None):
+        """Write `playlist()` to file atomically, players never read partial playlist."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.playlist(base_url, end))
+        os.replace(tmp_path, path)
+
+    def __read_list(self, fd):
+        # names of segment list are relative to directory of segments.
+        directory = os.path.dirname(self.pattern)
+        try:
+            with os.fdopen(fd, "r", newline="") as f:
+                for row in csv.reader(f):
+                    if len(row) != 3:
+                        continue
+
+                    filename, start, end = row
+                    segment = SegmentInfo(self.__sequence, os.path.join(directory, filename),
+                                          float(start), float(end))
+                    self.__sequence += 1
+                    with self.__lock:
+                        self.segments.append(segment)
+                    self.__publish(segment)
+        finally:
+            self.ended = True
+
+    def __publish(self, segment):
+        with self.__lock:
+            callbacks = list(self.__callbacks)
+
+        for callback in callbacks:
+            try:
+                callback(segment)
+            except Exception:
+                # never stop reading, ffmpeg will block on full list pipe.
+                traceback.print_exc()
+
+    def __join(self):
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
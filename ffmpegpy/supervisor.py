@@ -0,0 +1,244 @@
+import random
+import threading
+import time
+
+from .capture import VideoCapture
+
+__all__ = ["CaptureSupervisor", "SupervisorMetrics", "backoff_delay"]
+
+STALL_TIMEOUT = 5.
+BACKOFF_INITIAL = 0.2
+BACKOFF_MAX = 30.
+BACKOFF_JITTER = 0.5
+# process, which delivers frames for this long, is healthy: backoff is reset.
+HEALTHY_DURATION = 10.
+
+
+def backoff_delay(failures, initial=BACKOFF_INITIAL, maximum=BACKOFF_MAX, jitter=BACKOFF_JITTER):
+    """
+    Exponential backoff with jitter: initial * 2^(failures - 1), capped at maximum, reduced by random
+    fraction up to `jitter`. Jitter spreads reconnects of many sources, which fail at the same time.
+    """
+    if failures <= 0:
+        return 0.
+    delay = min(maximum, initial * 2 ** (failures - 1))
+    return delay * (1 - jitter * random.random())
+
+
+class SupervisorMetrics(object):
+    """
+    Attributes
+    ----------
+    restarts: int
+        Number of restarts.
+
+    frames: int
+        Frames delivered by all runs.
+
+    time_to_first_frame: float | None
+        Seconds from start of last run to its first frame.
+
+    last_error: str | None
+        Reason of last restart.
+    """
+
+    def __init__(self):
+        self.created = time.monotonic()
+        self.restarts = 0
+        self.frames = 0
+        self.stalls = 0
+        self.time_to_first_frame = None
+        self.last_error = None
+        self.run_started = None
+        self.first_frame = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.as_dict()})"
+
+    @property
+    def uptime(self):
+        """Seconds since first frame of current run. 0 if no frame yet."""
+        if self.first_frame is None:
+            return 0.
+        return time.monotonic() - self.first_frame
+
+    def as_dict(self):
+        return {
+            "uptime": self.uptime,
+            "restarts": self.restarts,
+            "stalls": self.stalls,
+            "frames": self.frames,
+            "time_to_first_frame": self.time_to_first_frame,
+            "last_error": self.last_error,
+        }
+
+
+class CaptureSupervisor(object):
+    """
+    Keep capture running: restart process when it fails, ends or stalls.
+
+    Stall: consumer waits for frame and no data is read from process for `stall_timeout`, process is killed by
+    watchdog. Slow consumer or large frame, which arrives in many reads, isn't a stall.
+    Restart reuses probe and command of capture, nothing is probed or built again. Consecutive failures are
+    delayed by exponential backoff with jitter, see `backoff_delay`.
+
+    Parameters
+    ----------
+    capture: VideoCapture
+        Capture, which isn't started.
+
+    max_restarts: int | None
+        Give up after number of consecutive failures. None=never.
+
+    restart_on_eof: bool
+        Restart when source ends normally (live source). False=stop at end of file.
+
+    run_kwargs:
+        Arguments of `capture.run()`. Ex: pipe_size, timestamps
+
+    Examples:
+        supervisor = CaptureSupervisor(VideoCapture("rtsp://..."))
+        for frame in supervisor:
+            ...
+    """
+
+    def __init__(self, capture, stall_timeout=STALL_TIMEOUT, backoff=BACKOFF_INITIAL, backoff_max=BACKOFF_MAX,
+                 jitter=BACKOFF_JITTER, max_restarts=None, restart_on_eof=True, **run_kwargs):
+        if not isinstance(capture, VideoCapture):
+            raise TypeError("capture must be VideoCapture.")
+
+        if stall_timeout <= 0:
+            raise ValueError("stall_timeout must be > 0.")
+
+        self.capture = capture
+        self.stall_timeout = stall_timeout
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.max_restarts = max_restarts
+        self.restart_on_eof = restart_on_eof
+        self.run_kwargs = run_kwargs
+        self.metrics = SupervisorMetrics()
+
+        self.__failures = 0
+        self.__args = None
+        self.__waiting_since = None
+        self.__stalled = False
+        self.__stopped = threading.Event()
+        self.__lock = threading.Lock()
+        self.__watchdog = None
+
+    def __iter__(self):
+        return self.frames()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def frames(self):
+        """Iterate frames (result of `capture.read()`) until stop, end of file or too many failures."""
+        self.__start_watchdog()
+        try:
+            while not self.__stopped.is_set():
+                reason = None
+                try:
+                    self.__start()
+                    while True:
+                        frame = self.__read()
+                        if frame is None:
+                            break
+                        yield frame
+                except (RuntimeError, OSError) as e:
+                    # ProcessError, broken pipe, timeout, ...
+                    reason = "stalled" if self.__stalled else str(e) or e.__class__.__name__
+                finally:
+                    self.__kill()
+
+                if self.__stopped.is_set():
+                    return
+
+                if reason is None:
+                    if not self.restart_on_eof:
+                        return
+                    reason = "end of stream"
+                self.__wait_restart(reason)
+        finally:
+            self.__stopped.set()
+            self.__kill()
+
+    def stop(self):
+        self.__stopped.set()
+        self.__kill()
+
+    def __start(self):
+        self.__stalled = False
+        self.metrics.run_started = time.monotonic()
+        self.metrics.first_frame = None
+        with self.__lock:
+            self.capture.run(args=self.__args, **self.run_kwargs)
+            if self.__args is None:
+                self.__args = self.capture.process.command
+
+    def __read(self):
+        self.__waiting_since = time.monotonic()
+        try:
+            frame = self.capture.read()
+        finally:
+            self.__waiting_since = None
+
+        if frame is None:
+            return None
+
+        now = time.monotonic()
+        metrics = self.metrics
+        metrics.frames += 1
+        if metrics.first_frame is None:
+            metrics.first_frame = now
+            metrics.time_to_first_frame = now - metrics.run_started
+
+        if self.__failures and now - metrics.first_frame > HEALTHY_DURATION:
+            self.__failures = 0
+        return frame
+
+    def __wait_restart(self, reason):
+        self.__failures += 1
+        self.metrics.last_error = reason
+        if self.max_restarts is not None and self.__failures > self.max_restarts:
+            raise RuntimeError(f"Capture failed {self.__failures} times. Last error: {reason}")
+
+        # stop() interrupts waiting.
+        self.__stopped.wait(backoff_delay(self.__failures, self.backoff, self.backoff_max, self.jitter))
+        self.metrics.restarts += 1
+
+    def __kill(self):
+        with self.__lock:
+            self.capture.kill()
+
+    def __start_watchdog(self):
+        if self.__watchdog is not None and self.__watchdog.is_alive():
+            return
+
+        self.__watchdog = threading.Thread(target=self.__watch, name=f"{self.__class__.__name__}-watchdog",
+                                           daemon=True)
+        self.__watchdog.start()
+
+    def __watch(self):
+        interval = min(self.stall_timeout / 4, 1.)
+        while not self.__stopped.wait(interval):
+            waiting_since = self.__waiting_since
+            if waiting_since is None:
+                continue
+
+            # stalled: nothing is read since consumer waits and since last data of process.
+            process = self.capture.process
+            last_read = process.last_read if process is not None else None
+            if time.monotonic() - max(waiting_since, last_read or 0.) < self.stall_timeout:
+                continue
+
+            # blocked read returns when process is killed.
+            self.__stalled = True
+            self.metrics.stalls += 1
+            self.__waiting_since = None
+            self.__kill()
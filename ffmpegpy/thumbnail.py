@@ -0,0 +1,185 @@
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .util.lazy import lazy_import
+from ._ffmpeg import FFmpeg, InputStream, OutputStream, PIPE_LINE, LogLevel
+from .capture import Frame
+from .codecs.coding import Discard
+from .ffprobe import FFprobe
+from .formats.muxers.rawvideo import RawVideo
+from .formats.pixel_format import PixelFormat
+from .util.io import Subprocess
+
+__all__ = ["ThumbnailExtractor", "even_timestamps"]
+
+numpy = lazy_import("numpy")
+
+THUMBNAIL_SIZE = (160, None)
+SPRITE_COLUMNS = 10
+
+
+def even_timestamps(duration, count, start=0.):
+    """
+    `count` timestamps evenly spaced over [start, start + duration). Each one is middle of its interval,
+    so first and last frame (often black) are avoided.
+    """
+    if count < 1:
+        raise ValueError("count must be >= 1.")
+    return [start + duration * (idx + 0.5) / count for idx in range(count)]
+
+
+class ThumbnailExtractor(object):
+    """
+    Extract thumbnails at timestamps concurrently.
+
+    Each thumbnail is extracted by separate ffmpeg process with input-side seeking (`-ss` before `-i`),
+    which jumps to keyframe and decodes only frames up to timestamp. Frames are scaled in ffmpeg.
+    So extraction time depends on number of thumbnails / workers, not on duration of source.
+
+    Parameters
+    ----------
+    src: str
+        Source file. Require seekable input.
+
+    size: tuple
+        (width, height) of thumbnails. height=None keep aspect ratio of source.
+
+    workers: int | None
+        Number of concurrent ffmpeg processes. Default: number of CPUs.
+
+    keyframe: bool
+        Thumbnail is keyframe at or before timestamp, nothing else is decoded. Faster, timestamps are less accurate.
+    """
+
+    def __init__(self, src, size=THUMBNAIL_SIZE, workers=None, keyframe=False):
+        self.src = src
+        self.workers = workers or os.cpu_count() or 1
+        self.keyframe = keyframe
+        self.probe = FFprobe(src)
+        self.size = self.__thumbnail_size(size)
+
+        self.__processes = []
+        self.__lock = threading.Lock()
+
+    def __thumbnail_size(self, size):
+        width, height = size
+        if height is None:
+            info = self.probe.info
+            # even height, required by most pixel formats of encoders.
+            height = max(2, int(round(width * info.height / info.width / 2)) * 2)
+        return width, height
+
+    def timestamps(self, count):
+        """`count` timestamps evenly spaced over source."""
+        return even_timestamps(self.probe.info.duration, count)
+
+    def command(self, timestamp):
+        """Build command, which output one raw frame (bgr24) at timestamp."""
+        width, height = self.size
+
+        input_stream = InputStream(self.src)
+        input_stream.seek = timestamp
+        # parallelism is across processes.
+        input_stream.codec.threads = 1
+        if self.keyframe:
+            input_stream.codec.skip_frame = Discard.NONKEY
+
+        output_stream = OutputStream(PIPE_LINE, muxer=RawVideo())
+        output_stream.codec.pix_fmt = PixelFormat.BGR24
+        output_stream.add_video_filter(f"scale={width}:{height}")
+        output_stream.video_frames = 1
+        output_stream.an = None
+
+        mpeg = FFmpeg(input_stream, output_stream)
+        mpeg.nostdin = None
+        mpeg.loglevel = LogLevel.ERROR
+        return mpeg
+
+    def extract(self, timestamps):
+        """
+        Extract thumbnails at timestamps (seconds).
+
+        Returns
+        -------
+            List of (timestamp, Frame). Timestamps after end of source are skipped.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.__extract, timestamp) for timestamp in timestamps]
+
+            try:
+                thumbnails = [(timestamp, future.result()) for timestamp, future in zip(timestamps, futures)]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                self.kill()
+                raise
+
+        return [(timestamp, Frame(thumbnail)) for timestamp, thumbnail in thumbnails if thumbnail is not None]
+
+    def sprite(self, timestamps=None, count=None, columns=SPRITE_COLUMNS):
+        """
+        Tile thumbnails to sprite sheet, row by row.
+
+        Parameters
+        ----------
+        timestamps: list of float | None
+            Timestamps of thumbnails. None=`count` evenly spaced timestamps.
+
+        count: int | None
+            Number of thumbnails if timestamps is None.
+
+        columns: int
+            Thumbnails per row.
+
+        Returns
+        -------
+            (Frame, timestamp map). Timestamp map: list of dict(timestamp, x, y, width, height) of every tile.
+        """
+        if timestamps is None:
+            if count is None:
+                raise ValueError("Require timestamps or count.")
+            timestamps = self.timestamps(count)
+
+        thumbnails = self.extract(timestamps)
+        if not thumbnails:
+            raise RuntimeError("No thumbnail is extracted.")
+
+        width, height = self.size
+        columns = min(columns, len(thumbnails))
+        rows = math.ceil(len(thumbnails) / columns)
+        sheet = numpy.zeros((rows * height, columns * width, 3), dtype=numpy.uint8)
+
+        tiles = []
+        for idx, (timestamp, thumbnail) in enumerate(thumbnails):
+            x, y = idx % columns * width, idx // columns * height
+            sheet[y:y + height, x:x + width] = thumbnail.data_frame
+            tiles.append({"timestamp": timestamp, "x": x, "y": y, "width": width, "height": height})
+        return Frame(sheet), tiles
+
+    def kill(self):
+        with self.__lock:
+            for process in self.__processes:
+                if process.is_alive():
+                    process.kill()
+
+    def __extract(self, timestamp):
+        width, height = self.size
+        buffer = numpy.empty((height, width, 3), dtype=numpy.uint8)
+
+        process = self.command(timestamp).run(stdin=Subprocess.DEVNULL)
+        with self.__lock:
+            self.__processes.append(process)
+
+        try:
+            size = process.readinto(buffer)
+            process.wait()
+        finally:
+            with self.__lock:
+                self.__processes.remove(process)
+
+        if size < buffer.nbytes:
+            # timestamp is after end of source.
+            return None
+        return buffer
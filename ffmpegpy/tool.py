@@ -1,14 +1,214 @@
+import hashlib
+import json
+import os
 import re
+import shutil
 import subprocess
+import threading
+
+__all__ = [
+    "Capabilities", "capabilities",
+    "query_formats", "find_formats", "query_encoders", "find_encoders",
+    "query_decoders", "find_decoders", "query_devices", "find_devices"
+]
+
+FFMPEG_CMD = "ffmpegpy"
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ffmpegpy")
+
+RE_CODEC_LINE = re.compile(r"^\s*([VASFXBD.]{6})\s+(\S+)")
+RE_FORMAT_LINE = re.compile(r"^\s*([D ])([E ])[d ]?\s+(\S+)")
+
+_QUERIES = {
+    "version": "-version",
+    "formats": "-formats",
+    "encoders": "-encoders",
+    "decoders": "-decoders",
+    "hwaccels": "-hwaccels",
+}
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _parse_version(output):
+    # ffmpegpy version 4.4.2-0ubuntu0.22.04.1 Copyright (c) 2000-2021 the FFmpeg developers
+    tokens = output.strip().split(" ")
+    if len(tokens) < 3:
+        return ""
+    return tokens[2]
+
+
+def _parse_formats(output):
+    demuxers, muxers = set(), set()
+    for line in output.split("\n"):
+        matched = RE_FORMAT_LINE.match(line)
+        if not matched or matched.group(3) == "=":
+            continue
+
+        demux, mux, names = matched.groups()
+        for name in names.split(","):
+            if demux == "D":
+                demuxers.add(name)
+            if mux == "E":
+                muxers.add(name)
+    return sorted(demuxers), sorted(muxers)
+
+
+def _parse_codecs(output):
+    codecs = []
+    for line in output.split("\n"):
+        matched = RE_CODEC_LINE.match(line)
+        if not matched or matched.group(2) == "=":
+            continue
+        codecs.append(matched.group(2))
+    return codecs
+
+
+def _parse_hwaccels(output):
+    return [line.strip() for line in output.strip().split("\n")[1:] if line.strip()]
+
+
+class Capabilities(object):
+    """
+    Capabilities of FFmpeg binary: version, muxers, demuxers, encoders, decoders and hwaccels.
+
+    Use `capabilities()` to get memoized instance instead of init.
+
+    Parameters
+    ----------
+    binary: str
+        Absolute path of FFmpeg binary.
+    """
+
+    def __init__(self, binary, version="", demuxers=(), muxers=(), encoders=(), decoders=(), hwaccels=()):
+        self.binary = binary
+        self.version = version
+        self.demuxers = list(demuxers)
+        self.muxers = list(muxers)
+        self.encoders = list(encoders)
+        self.decoders = list(decoders)
+        self.hwaccels = list(hwaccels)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.binary} - {self.version}): " \
+               f"{len(self.formats)} formats, {len(self.encoders)} encoders, " \
+               f"{len(self.decoders)} decoders, {len(self.hwaccels)} hwaccels"
+
+    @property
+    def formats(self):
+        return sorted(set(self.demuxers).union(self.muxers))
+
+    @classmethod
+    def query(cls, binary):
+        """
+        Query all capabilities of binary.
+        FFmpeg exits after first listing option, so all listings are queried concurrently.
+
+        Raises
+        ------
+        RuntimeError:
+            Any listing fails (non-zero exit code) or is empty. Nothing is cached.
+        """
+        processes = {
+            name: subprocess.Popen([binary, "-hide_banner", "-loglevel", "error", arg],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            for name, arg in _QUERIES.items()
+        }
+        results = {name: (process.communicate(), process.returncode) for name, process in processes.items()}
+
+        outputs = {}
+        for name, ((out, err), returncode) in results.items():
+            if returncode != 0 or not out.strip():
+                raise RuntimeError(f"`{binary} {_QUERIES[name]}` failed - code {returncode}: "
+                                   f"{err.decode(errors='replace').strip()}")
+            outputs[name] = out.decode(errors="replace")
+
+        demuxers, muxers = _parse_formats(outputs["formats"])
+        caps = cls(
+            binary,
+            version=_parse_version(outputs["version"]),
+            demuxers=demuxers,
+            muxers=muxers,
+            encoders=_parse_codecs(outputs["encoders"]),
+            decoders=_parse_codecs(outputs["decoders"]),
+            hwaccels=_parse_hwaccels(outputs["hwaccels"])
+        )
+        if not caps.is_valid():
+            raise RuntimeError(f"`{binary}` listed no formats, encoders or decoders.")
+        return caps
+
+    def is_valid(self):
+        """Every listing has entries, except hwaccels (binary may have none)."""
+        return bool(self.version and self.demuxers and self.muxers and self.encoders and self.decoders)
+
+    @staticmethod
+    def cache_path(binary):
+        """
+        Cache file of binary. Key by binary's path and its identity (mtime, size),
+        so upgraded binary (new version) is queried again.
+        """
+        stat = os.stat(binary)
+        key = hashlib.sha1(f"{binary}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+        return os.path.join(CACHE_DIR, f"capabilities-{key}.json")
+
+    @classmethod
+    def load(cls, binary):
+        try:
+            with open(cls.cache_path(binary), "r") as f:
+                caps = cls(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        # empty cache of failed query (older version) is queried again.
+        return caps if caps.is_valid() else None
+
+    def save(self):
+        path = self.cache_path(self.binary)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.__dict__, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # cache is optional. Read-only home directory still work.
+            pass
+
+
+def capabilities(binary=FFMPEG_CMD, refresh=False):
+    """
+    Get capabilities of FFmpeg binary.
+
+    Populated lazily at first call, memoized per process and persisted on disk (see `CACHE_DIR`).
+
+    Parameters
+    ----------
+    binary: str
+        Name or path of FFmpeg binary.
+
+    refresh: bool
+        Force re-query binary and update cache.
+    """
+    path = shutil.which(binary)
+    if path is None:
+        raise RuntimeError(f"FFmpeg binary `{binary}` not found.")
+    path = os.path.realpath(path)
+
+    with _registry_lock:
+        if not refresh and path in _registry:
+            return _registry[path]
+
+        caps = None if refresh else Capabilities.load(path)
+        if caps is None:
+            # cached only after successful query.
+            caps = Capabilities.query(path)
+            caps.save()
+
+        _registry[path] = caps
+        return caps
 
 
 def query_formats():
-    re_spaces = re.compile(r"\s+")
-    formats_raw = subprocess.getoutput("ffmpegpy -loglevel quiet -formats").strip().split("\n")[4:]
-    formats = []
-    for fmt in formats_raw:
-        formats.append(re_spaces.sub(" ", fmt).strip().split(" ")[1])
-    return sorted(formats)
+    return capabilities().formats
 
 
 def find_formats(format_regex):
@@ -17,11 +217,7 @@ def find_formats(format_regex):
 
 
 def query_encoders():
-    encoders_raw = subprocess.getoutput("ffmpegpy -loglevel quiet -encoders").strip().split("\n")[10:]
-    encoders = []
-    for encoder in encoders_raw:
-        encoders.append(encoder.strip().split(" ")[1])
-    return encoders
+    return capabilities().encoders
 
 
 def find_encoders(encoder_regex):
@@ -30,11 +226,7 @@ def find_encoders(encoder_regex):
 
 
 def query_decoders():
-    decoders_raw = subprocess.getoutput("ffmpegpy -loglevel quiet -decoders").strip().split("\n")[10:]
-    decoders = []
-    for decoder in decoders_raw:
-        decoders.append(decoder.strip().split(" ")[1])
-    return decoders
+    return capabilities().decoders
 
 
 def find_decoders(decoder_regex):
@@ -44,9 +236,7 @@ def find_decoders(decoder_regex):
 
 # query available devices
 def query_devices():
-    # for device in subprocess.getoutput("ffmpegpy -loglevel quiet -hwaccels").strip().split("\n")[1:]:
-    #     setattr(HWAccelType, device.upper(), device)
-    return subprocess.getoutput("ffmpegpy -loglevel quiet -hwaccels").strip().split("\n")[1:]
+    return capabilities().hwaccels
 
 
 def find_devices(device_regex):
@@ -1,28 +1,475 @@
+import errno
 import os
+import shutil
 import subprocess
+import tempfile
+import time
+from functools import lru_cache
 from multiprocessing.queues import Queue
 from threading import Thread
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Linux only. Values of <linux/fcntl.h>, fcntl module has them since Python 3.10
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+F_GETPIPE_SZ = getattr(fcntl, "F_GETPIPE_SZ", 1032)
+PIPE_MAX_SIZE_FILE = "/proc/sys/fs/pipe-max-size"
+PASSTHROUGH_CHUNK = 0x100000
+STDIN_CHUNK = 0x10000
+
+
+@lru_cache(maxsize=None)
+def pipe_max_size():
+    """Max pipe capacity of unprivileged process (bytes). None if pipe can't be resized."""
+    if fcntl is None:
+        return None
+
+    try:
+        with open(PIPE_MAX_SIZE_FILE) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def set_pipe_size(fd, size=None):
+    """
+    Resize capacity of pipe (Linux only). Bigger pipe is less syscalls and context switches per frame.
+
+    Parameters
+    ----------
+    fd: int
+        Any end of pipe.
+
+    size: int | None
+        Expected capacity (bytes), capped at `pipe_max_size()`. None=max size.
+
+    Returns
+    -------
+        Capacity of pipe, kernel rounds it up to power of 2 pages. None if pipe can't be resized.
+    """
+    max_size = pipe_max_size()
+    if max_size is None:
+        return None
+
+    size = max_size if size is None else min(size, max_size)
+    try:
+        return fcntl.fcntl(fd, F_SETPIPE_SZ, size)
+    except OSError:
+        # EPERM: over per-user limit (pipe-user-pages-soft), EBUSY: pipe holds more data than size.
+        try:
+            return fcntl.fcntl(fd, F_GETPIPE_SZ)
+        except OSError:
+            return None
+
+
+def passthrough(src_fd, dst_fd, chunk_size=PASSTHROUGH_CHUNK):
+    """
+    Move data from pipe to file descriptor (file, socket, pipe) until EOF.
+
+    On Linux, data is moved by kernel (`os.splice`) and never copied to Python memory.
+    Fallback: read / write via reused buffer. `os.sendfile` isn't used, it can't read from pipe.
+
+    Returns
+    -------
+        Number of bytes moved.
+    """
+    total = 0
+    if hasattr(os, "splice"):
+        try:
+            while True:
+                size = os.splice(src_fd, dst_fd, chunk_size)
+                if not size:
+                    return total
+                total += size
+        except OSError as e:
+            # EINVAL: destination doesn't support splice (Ex: file opened with O_APPEND). Nothing is moved.
+            if e.errno not in (errno.EINVAL, errno.ENOSYS):
+                raise
+
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        size = os.readv(src_fd, [buffer])
+        if not size:
+            return total
+
+        written = 0
+        while written < size:
+            written += os.write(dst_fd, view[written:size])
+        total += size
+
+
+def iter_chunks(data, chunk_size=STDIN_CHUNK):
+    """
+    Iterate data as buffers.
+
+    Parameters
+    ----------
+    data: bytes | bytearray | memoryview | file-like | iterable of bytes
+        Buffer is one chunk, it isn't copied. File-like is read by `readinto` a reused buffer
+        (or `read`): chunk is valid until next chunk.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        yield memoryview(data).cast("B")
+    elif hasattr(data, "readinto"):
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            size = data.readinto(buffer)
+            if not size:
+                break
+            yield view[:size]
+    elif hasattr(data, "read"):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        try:
+            chunks = iter(data)
+        except TypeError:
+            raise TypeError(f"Require bytes, file-like or iterable of bytes. Got {type(data)}") from None
+        yield from chunks
+
+
+class StdinWriter(Thread):
+    """
+    Write data to stdin of process in background, then close stdin (EOF).
+
+    Write blocks while pipe is full, so data is read from source only as fast as process consumes it.
+    Process, which stops reading early (Ex: `-t`, `-frames`), isn't an error: rest of data is skipped.
+
+    Parameters
+    ----------
+    stdin: file-like | callable
+        Write end of pipe. It's closed by writer. Callable opens it in writer thread, Ex: FIFO, whose open
+        blocks until process opens the other end.
+
+    data: bytes | bytearray | memoryview | file-like | iterable of bytes
+        See `iter_chunks`
+
+    Attributes
+    ----------
+    bytes_written: int
+    """
+
+    def __init__(self, stdin, data, chunk_size=STDIN_CHUNK):
+        super().__init__(name=f"{self.__class__.__name__}-{id(stdin):x}", daemon=True)
+        self.stdin = stdin
+        self.data = data
+        self.chunk_size = chunk_size
+        self.bytes_written = 0
+        self.__exception = None
+
+    def run(self):
+        if callable(self.stdin):
+            try:
+                self.stdin = self.stdin()
+            except Exception as e:
+                self.__exception = e
+                return
+
+        fd = self.stdin.fileno()
+        try:
+            for chunk in iter_chunks(self.data, self.chunk_size):
+                view = memoryview(chunk).cast("B")
+                while view:
+                    size = os.write(fd, view)
+                    self.bytes_written += size
+                    view = view[size:]
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            self.__exception = e
+        finally:
+            try:
+                self.stdin.close()
+            except OSError:
+                pass
+
+    def wait(self, timeout=None):
+        """Wait until all data is written. Re-raise error of source."""
+        self.join(timeout)
+        if self.__exception is not None:
+            raise self.__exception
+
+
+class Pipe(object):
+    """
+    Extra pipe between Python and ffmpeg. Path is `pipe:N`, N is descriptor inherited by process.
+
+    Use as path of InputStream (Python writes, mode="w") or OutputStream (Python reads, mode="r").
+    `FFmpeg.run` passes end of process and closes it in Python after start, so each side sees EOF
+    when the other side closes. Many inputs are fed concurrently, see `feed`.
+
+    Parameters
+    ----------
+    mode: str
+        "w": Python writes, "r": Python reads.
+
+    size: int | None
+        Capacity of pipe. See `set_pipe_size`. None=system default.
+
+    Examples:
+        overlay = Pipe("w")
+        analysis = Pipe("r")
+        ...
+        process = mpeg.run()
+        overlay.feed(png_frames)
+        analysis.readinto(buffer)
+    """
+
+    def __init__(self, mode, size=None):
+        if mode not in ("r", "w"):
+            raise ValueError("mode must be `r` or `w`.")
+
+        self.mode = mode
+        read_fd, write_fd = os.pipe()
+        self.fd, self.child_fd = (read_fd, write_fd) if mode == "r" else (write_fd, read_fd)
+        if size:
+            set_pipe_size(self.fd, size)
+        self.writer = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(fd={self.fd}, child_fd={self.child_fd}, mode={self.mode!r})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def path(self):
+        """`pipe:N`. Descriptor of process is closed after start, so pipe serves only one run."""
+        if self.child_fd is None:
+            raise ValueError("Pipe is used by a process or closed, create a new Pipe for every run.")
+        return f"pipe:{self.child_fd}"
+
+    def fileno(self):
+        """Descriptor of Python end."""
+        if self.fd is None:
+            raise ValueError("Pipe is closed.")
+        return self.fd
+
+    def close_child(self):
+        """Close end of process in Python. Called by `FFmpeg.run` after start."""
+        if self.child_fd is not None:
+            os.close(self.child_fd)
+            self.child_fd = None
+
+    def detach(self):
+        """Take descriptor of Python end, caller closes it."""
+        fd, self.fd = self.fileno(), None
+        return fd
+
+    def read(self, size):
+        """At most `size` bytes, b"" at EOF."""
+        return os.read(self.fileno(), size)
+
+    def readinto(self, buffer):
+        """Read until buffer is full or EOF. Return number of bytes."""
+        view = memoryview(buffer).cast("B")
+        total = 0
+        while total < len(view):
+            size = os.readv(self.fileno(), [view[total:]])
+            if not size:
+                break
+            total += size
+        return total
+
+    def write(self, data):
+        view = memoryview(data).cast("B")
+        while view:
+            view = view[os.write(self.fileno(), view):]
+
+    def feed(self, data, chunk_size=STDIN_CHUNK):
+        """Write data in background, then close pipe (EOF). Pipe is opened by writer. See `StdinWriter`"""
+        self.writer = StdinWriter(lambda: os.fdopen(self.detach(), "wb"), data, chunk_size)
+        self.writer.start()
+        return self.writer
+
+    def close(self):
+        self.close_child()
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class NamedPipe(Pipe):
+    """
+    Pipe by named FIFO (POSIX). Path is file path, Python end is opened by `open`, which blocks until
+    process opens its end. Use it when ffmpeg requires file path. Ex: muxer options, inputs of filters.
+    FIFO is removed by `close`.
+    """
+
+    def __init__(self, mode, directory=None):
+        if mode not in ("r", "w"):
+            raise ValueError("mode must be `r` or `w`.")
+
+        self.mode = mode
+        self.fd = None
+        self.child_fd = None
+        self.writer = None
+        self.__directory = tempfile.mkdtemp(prefix="ffmpegpy-", dir=directory)
+        self.name = os.path.join(self.__directory, "fifo")
+        os.mkfifo(self.name)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name!r}, mode={self.mode!r})"
+
+    @property
+    def path(self):
+        return self.name
+
+    def open(self):
+        """Open Python end. Blocks until process opens FIFO, so call it after process start."""
+        if self.fd is None:
+            self.fd = os.open(self.name, os.O_RDONLY if self.mode == "r" else os.O_WRONLY)
+        return self.fd
+
+    def fileno(self):
+        if self.fd is None and self.__directory is None:
+            raise ValueError("Pipe is closed.")
+        return self.open()
+
+    def close(self):
+        super().close()
+        if self.__directory is not None:
+            shutil.rmtree(self.__directory, ignore_errors=True)
+            self.__directory = None
+
+
+class ProcessError(RuntimeError):
+    """
+    Process exited with error.
+
+    Attributes
+    ----------
+    returncode: int
+        Exit code of process.
+
+    logs: list of (timestamp, level, message)
+        Last log lines of process. See `LogReader`
+    """
+
+    def __init__(self, message, returncode=None, logs=()):
+        self.returncode = returncode
+        self.logs = list(logs)
+
+        if self.logs:
+            message += "\n" + "\n".join(f"[{level}] {line}" for _, level, line in self.logs)
+        super().__init__(message)
+
 
 class Subprocess(subprocess.Popen):
     PIPE = subprocess.PIPE
+    DEVNULL = subprocess.DEVNULL
+
+    # ProgressReader of process, set by `FFmpeg.run(progress=...)`
+    progress_reader = None
+
+    # LogReader, which drains stderr of process. Set by `FFmpeg.run`
+    log_reader = None
+
+    # capacity of stdout pipe, None=system default. See `set_pipe_size`
+    pipe_size = None
+
+    # StdinWriter, which feeds in-memory input to stdin. Set by `FFmpeg.run`
+    stdin_writer = None
+
+    # command line built by `FFmpeg.build()`, without arguments of run (Ex: -progress). Set by `FFmpeg.run`
+    command = None
+
+    # `time.monotonic()` when data is read from stdout last time. None=nothing is read.
+    last_read = None
 
     def read(self, chunk_size=-1):
         if self.poll() is not None:
-            raise RuntimeError(f"Process closed - code {self.returncode}")
+            raise self.error(f"Process closed - code {self.returncode}")
 
         output_bytes = self.stdout.read(chunk_size)
 
         if output_bytes.__len__() > 0:
+            self.last_read = time.monotonic()
             return output_bytes
 
-        outputs, errs = self.communicate()
-        if outputs is None and not errs:
-            raise RuntimeError(f"Process closed - code {self.returncode}")
+        if self.log_reader is None:
+            outputs, errs = self.communicate()
+            if outputs is None and not errs:
+                raise RuntimeError(f"Process closed - code {self.returncode}")
 
-        if errs:
-            raise RuntimeError(f"Read error - code {self.returncode}:", errs)
-        return outputs
+            if errs:
+                raise RuntimeError(f"Read error - code {self.returncode}:", errs)
+            return outputs
+
+        # stderr is drained by log_reader, communicate() mustn't read it.
+        if self.wait() != 0:
+            raise self.error(f"Read error - code {self.returncode}")
+        return output_bytes
+
+    def readinto(self, buffer):
+        """
+        Read stdout until buffer is full or EOF.
+
+        Each read is sized to remaining bytes of buffer, large buffer (Ex: frame) is filled by few syscalls
+        and data isn't copied via internal buffer of stdout.
+
+        Returns
+        -------
+            Number of bytes read. Less than size of buffer only at EOF.
+        """
+        view = memoryview(buffer).cast("B")
+        total = 0
+        while total < len(view):
+            # at most one read syscall
+            size = self.stdout.readinto1(view[total:])
+            if not size:
+                break
+            total += size
+            self.last_read = time.monotonic()
+
+        if total < len(view) and self.wait() != 0:
+            raise self.error(f"Read error - code {self.returncode}")
+        return total
+
+    def set_pipe_size(self, size=None):
+        """
+        Resize stdout pipe of process. See `set_pipe_size`
+
+        Every enlarged pipe is charged to pipe-user-pages-soft of user, stdin keeps its capacity.
+
+        Returns
+        -------
+            Capacity of stdout pipe. None if it can't be resized.
+        """
+        if self.stdout is not None:
+            self.pipe_size = set_pipe_size(self.stdout.fileno(), size)
+        return self.pipe_size
+
+    def error(self, message):
+        """Create ProcessError with error logs (or last logs if no error) of process."""
+        logs = ()
+        if self.log_reader is not None:
+            # last lines may be still in pipe.
+            if self.log_reader.is_alive():
+                self.log_reader.join(timeout=1)
+            logs = self.log_reader.errors() or self.log_reader.tail()
+        return ProcessError(message, self.returncode, logs)
+
+    def detach_stderr(self):
+        """Take stderr from process, so `communicate()` doesn't read it."""
+        stderr, self.stderr = self.stderr, None
+        return stderr
+
+    def detach_stdin(self):
+        """Take stdin from process, so `communicate()` and `write()` don't write it."""
+        stdin, self.stdin = self.stdin, None
+        return stdin
 
     def write(self, data):
         if self.stdin is None:
@@ -0,0 +1,54 @@
+import importlib
+import sys
+import threading
+from types import ModuleType
+
+__all__ = [
+    "LazyModule", "lazy_import"
+]
+
+
+class LazyModule(ModuleType):
+    """
+    Module proxy, which import the real module at first attribute access.
+
+    Keep heavy dependencies (cv2, numpy, ...) out of import time of modules only build command or probe.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__lock = threading.Lock()
+        self.__module = None
+
+    def __repr__(self):
+        state = "loaded" if self.__module is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __dir__(self):
+        return dir(self.load())
+
+    def is_loaded(self):
+        return self.__module is not None
+
+    def load(self) -> ModuleType:
+        if self.__module is None:
+            with self.__lock:
+                if self.__module is None:
+                    self.__module = importlib.import_module(self.__name__)
+        return self.__module
+
+
+def lazy_import(name) -> ModuleType:
+    """
+    Import module lazily. Return imported module if it was already imported.
+
+    Examples:
+        numpy = lazy_import("numpy")
+        numpy.zeros(3)  # numpy is imported here.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
@@ -344,7 +344,8 @@ class OptionsBase(object):
             if attr.startswith("_"):
                 continue
 
-            opt = getattr(self.__class__, attr)
+            # instance's attributes aren't options.
+            opt = getattr(self.__class__, attr, None)
             if not isinstance(opt, Option):
                 continue
 
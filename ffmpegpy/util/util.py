@@ -1,4 +1,5 @@
 import subprocess
+from functools import lru_cache
 
 from ..value import Flags
 
@@ -21,9 +22,10 @@ def check_type(value, _type):
     return value
 
 
+@lru_cache(maxsize=None)
 def number_of_gpus():
     """
-    Count numbers of NVIDIA GPU
+    Count numbers of NVIDIA GPU. Memoized, `nvidia-smi` only run at first call.
     """
     try:
         return int(subprocess.getoutput("nvidia-smi --query-gpu=name --format=csv,noheader | wc -l"))
@@ -0,0 +1,84 @@
+import json
+
+from ffmpegpy.ffprobe import AudioProbeInfo, FFprobe, ProbeInfo
+
+# stream of `ffprobe -show_format -show_streams -of json` (aac of mp4)
+AUDIO_STREAM = {
+    "index": 1,
+    "codec_name": "aac",
+    "codec_long_name": "AAC (Advanced Audio Coding)",
+    "profile": "LC",
+    "codec_type": "audio",
+    "codec_tag_string": "mp4a",
+    "codec_tag": "0x6134706d",
+    "sample_fmt": "fltp",
+    "sample_rate": "48000",
+    "channels": 2,
+    "channel_layout": "stereo",
+    "bits_per_sample": 0,
+    "r_frame_rate": "0/0",
+    "avg_frame_rate": "0/0",
+    "time_base": "1/48000",
+    "start_pts": 0,
+    "start_time": "0.000000",
+    "duration_ts": 480256,
+    "duration": "10.005333",
+    "bit_rate": "128002",
+    "nb_frames": "469",
+    "disposition": {"default": 1, "dub": 0},
+    "tags": {"language": "und", "handler_name": "SoundHandler"},
+}
+
+VIDEO_STREAM = {
+    "index": 0,
+    "codec_name": "h264",
+    "codec_type": "video",
+    "width": 1280,
+    "height": 720,
+    "pix_fmt": "yuv420p",
+    "r_frame_rate": "30000/1001",
+    "duration": "10.010000",
+    "nb_frames": "300",
+}
+
+
+def test_audio_probe_info():
+    info = AudioProbeInfo(AUDIO_STREAM)
+    assert info.index == 1
+    assert info.codec_name == "aac"
+    assert info.sample_rate == 48000
+    assert info.channels == 2
+    assert info.channel_layout == "stereo"
+    assert info.sample_fmt == "fltp"
+    assert info.duration == 10.005333
+
+
+def test_probe_info_audio():
+    probe_info = ProbeInfo()
+    probe_info.streams = [VIDEO_STREAM, AUDIO_STREAM]
+    assert probe_info.audio().sample_rate == 48000
+
+
+def test_read_audio_only(monkeypatch):
+    output = json.dumps({"streams": [AUDIO_STREAM], "format": {"duration": "10.005333"}})
+    monkeypatch.setattr(FFprobe, "_FFprobe__run", staticmethod(lambda cmd: output))
+
+    probe = FFprobe("speech.m4a")
+    probe.refresh()
+    info = probe.info
+    assert info.codec_name == "aac"
+    assert info.duration == 10.005333
+    assert not info.is_set(ProbeInfo.r_frame_rate)
+    assert info.others["sample_rate"] == "48000"
+
+
+def test_read_video(monkeypatch):
+    output = json.dumps({"streams": [VIDEO_STREAM, AUDIO_STREAM], "format": {}})
+    monkeypatch.setattr(FFprobe, "_FFprobe__run", staticmethod(lambda cmd: output))
+
+    probe = FFprobe("clip.mp4")
+    probe.refresh()
+    info = probe.info
+    assert info.size == (1280, 720)
+    assert abs(info.r_frame_rate - 29.97) < 0.01
+    assert info.audio().channels == 2